@@ -14,6 +14,7 @@
     4. Agent 执行每个函数调用，存储 tool 消息（包含 tool_call_id）
     5. 重复 2-4 直到 LLM 给出最终回复或达到最大迭代次数
 """
+import asyncio
 from typing import List, Dict, Any, Optional, Callable
 from loguru import logger
 
@@ -21,6 +22,20 @@ from agent.providers.base import LLMProvider, LLMMessage, LLMResponse
 from agent.functions.registry import FunctionRegistry
 from agent.functions.executor import ToolExecutor
 
+# token 估算器：可用时用 tiktoken 的 BPE 编码计数（够准的近似，
+# 无需与具体模型的分词器完全一致），未安装时退回字符数估算
+# （中文约 1 字 1 token，偏保守，宁可多算不可少算）。
+try:
+    import tiktoken
+
+    _encoding = tiktoken.encoding_for_model("gpt-4o")
+
+    def _estimate_tokens(text: str) -> int:
+        return len(_encoding.encode(text))
+except ImportError:  # pragma: no cover - 取决于安装环境
+    def _estimate_tokens(text: str) -> int:
+        return len(text)
+
 
 class Agent:
     """Agent 核心类，整合 LLM 提供商和函数调用机制。
@@ -60,6 +75,7 @@ class Agent:
         provider: LLMProvider,
         function_registry: Optional[FunctionRegistry] = None,
         system_prompt: Optional[str] = None,
+        history_token_limit: int = 4096,
     ) -> None:
         """初始化 Agent 实例。
 
@@ -67,11 +83,15 @@ class Agent:
             provider: LLM 提供商实例，必须实现 LLMProvider 接口。
             function_registry: 函数注册表。如果为 None，创建空注册表。
             system_prompt: 系统提示词，设置 Agent 的行为和角色。
+            history_token_limit: 对话历史的 token 预算。长会话超出
+                预算时，最旧的轮次会被压缩成一行工具调用摘要（见
+                _condense_history）。传 0 关闭压缩。
         """
         self.provider = provider
         self.function_registry = function_registry or FunctionRegistry()
         self.tool_executor = ToolExecutor(self.function_registry)
         self.system_prompt = system_prompt
+        self.history_token_limit = history_token_limit
         self.conversation_history: List[LLMMessage] = []
 
         # 添加系统提示词到历史记录
@@ -108,6 +128,9 @@ class Agent:
             LLMMessage(role="user", content=user_message)
         )
 
+        # 长会话：发送前把超出 token 预算的旧轮次压缩成摘要
+        self._condense_history()
+
         iterations: int = 0
         function_calls_made: List[Dict[str, Any]] = []
         response: Optional[LLMResponse] = None
@@ -150,7 +173,9 @@ class Agent:
                     "iterations": iterations,
                 }
 
-            # 处理函数调用：执行每个函数并将结果返回给 LLM
+            # 处理函数调用：同一轮的多个调用互相独立，并发执行
+            # （执行器把同步工具移到工作线程，I/O 等待得以重叠），
+            # 结果按原顺序写回历史，与 tool_use 块一一对应。
             for func_call in response.function_calls:
                 # 记录函数调用信息
                 function_calls_made.append({
@@ -158,39 +183,24 @@ class Agent:
                     "arguments": func_call.arguments,
                 })
 
-                try:
-                    # 执行函数调用
-                    result: Any = await self.tool_executor.execute(
-                        func_call.name, func_call.arguments
-                    )
-
-                    # 格式化函数执行结果
-                    result_str: str = self.tool_executor.format_result(result)
-
-                    # 将函数结果添加到对话历史
-                    # 使用 role="tool" + tool_call_id 关联调用和结果
-                    self.conversation_history.append(
-                        LLMMessage(
-                            role="tool",
-                            content=result_str,
-                            name=func_call.name,
-                            tool_call_id=func_call.id,
-                        )
-                    )
-
-                except Exception as e:
-                    # 函数执行失败，记录错误到对话历史
-                    logger.error(
-                        f"Error executing function {func_call.name}: {e}"
-                    )
-                    self.conversation_history.append(
-                        LLMMessage(
-                            role="tool",
-                            content=f"错误: {str(e)}",
-                            name=func_call.name,
-                            tool_call_id=func_call.id,
-                        )
+            result_strs = await asyncio.gather(
+                *(
+                    self._run_tool_call(fc)
+                    for fc in response.function_calls
+                )
+            )
+            for func_call, result_str in zip(
+                response.function_calls, result_strs
+            ):
+                # 使用 role="tool" + tool_call_id 关联调用和结果
+                self.conversation_history.append(
+                    LLMMessage(
+                        role="tool",
+                        content=result_str,
+                        name=func_call.name,
+                        tool_call_id=func_call.id,
                     )
+                )
 
             # 继续循环，让 LLM 基于函数结果继续处理
 
@@ -202,6 +212,115 @@ class Agent:
             "iterations": iterations,
         }
 
+    async def _run_tool_call(self, func_call: Any) -> str:
+        """执行单个工具调用并格式化结果。
+
+        执行失败不向上抛出，而是把错误文本作为工具结果返回给
+        LLM，让其决定如何继续（与历史行为一致）。
+        """
+        try:
+            result: Any = await self.tool_executor.execute(
+                func_call.name, func_call.arguments
+            )
+            return self.tool_executor.format_result(result)
+        except Exception as e:
+            # 函数执行失败，记录错误到对话历史
+            logger.error(
+                f"Error executing function {func_call.name}: {e}"
+            )
+            return f"错误: {str(e)}"
+
+    def _condense_history(self) -> None:
+        """历史超出 token 预算时，把最旧的轮次压缩成一行摘要。
+
+        多轮会话会不断积累工具调用的 JSON 结果，每一轮都随请求
+        整体重发，prefill 成本随轮数线性上涨。本方法在预算超限时
+        从最旧的非 system 消息开始丢弃整轮对话，并把其中的工具
+        调用压缩成 "<prior tool calls: ...>" 一行提示，保留结构化
+        的操作线索而舍弃原始文本。
+
+        丢弃以轮次为单位对齐：绝不留下孤立的 assistant/tool 消息，
+        否则 tool_result 会失去对应的 tool_use 而被 API 拒绝。
+        """
+        limit = self.history_token_limit
+        if not limit:
+            return
+        total = sum(
+            _estimate_tokens(m.content or "")
+            for m in self.conversation_history
+        )
+        if total <= limit:
+            return
+
+        kept = self.conversation_history
+        # system 前缀始终保留（可缓存前缀，见 provider 层）
+        start = 1 if kept and kept[0].role == "system" else 0
+        dropped_calls: List[str] = []
+
+        def _drop_one() -> None:
+            nonlocal total
+            msg = kept.pop(start)
+            total -= _estimate_tokens(msg.content or "")
+            if msg.role == "assistant" and msg.tool_calls:
+                for fc in msg.tool_calls:
+                    args = ", ".join(
+                        f"{k}={v}" for k, v in (fc.arguments or {}).items()
+                    )
+                    dropped_calls.append(f"{fc.name}({args})")
+
+        # 至少保留最后一条（刚追加的用户消息）
+        while total > limit and len(kept) - start > 1:
+            _drop_one()
+        # 对齐到轮次边界：继续丢弃直到下一条保留消息是 user 开头
+        while len(kept) - start > 1 and kept[start].role != "user":
+            _drop_one()
+
+        if dropped_calls:
+            summary = (
+                "<prior tool calls: " + ", ".join(dropped_calls) + ">"
+            )
+            kept.insert(start, LLMMessage(role="user", content=summary))
+            logger.debug(
+                f"Condensed history: dropped {len(dropped_calls)} "
+                f"tool-call turns into summary"
+            )
+
+    def _fresh_clone(self) -> "Agent":
+        """创建一个历史独立的 Agent 副本。
+
+        副本与原 Agent 共享 provider、函数注册表和系统提示词
+        （均为只读复用，无拷贝开销），但拥有各自的对话历史，
+        供并发批处理时互不干扰地使用。
+        """
+        return Agent(
+            self.provider,
+            function_registry=self.function_registry,
+            system_prompt=self.system_prompt,
+        )
+
+    async def run_batch_async(
+        self,
+        prompts: List[str],
+        **kwargs: Any,
+    ) -> List[Dict[str, Any]]:
+        """并发处理一批互相独立的消息。
+
+        每条消息由一个独立历史的 Agent 副本处理，所有 LLM 调用
+        通过 asyncio.gather 并发分派：批量总耗时约等于最慢的
+        一次调用，而非各次调用之和。适合把"一句话多笔业务"
+        拆成多条单一意图的消息并行处理。
+
+        Args:
+            prompts: 用户消息列表，各条消息之间不共享上下文。
+            **kwargs: 透传给 chat 方法的额外参数。
+
+        Returns:
+            与 prompts 等长的结果列表，每项为 chat 方法的返回字典。
+        """
+        return await asyncio.gather(
+            *(self._fresh_clone().chat(p, **kwargs) for p in prompts)
+        )
+
     async def parse_message(
         self,
         sender: str,
@@ -4,6 +4,8 @@
 调用的函数。执行器会从注册表中查找函数，执行函数调用，并格式化结果
 供 LLM 使用。
 """
+import asyncio
+from inspect import iscoroutinefunction
 from typing import Dict, Any, Optional
 from loguru import logger
 
@@ -81,12 +83,25 @@ class ToolExecutor:
             )
         
         try:
-            # 调用函数，使用关键字参数展开
+            # 注册时编译的校验器先行把关（缺省时跳过）
+            if func_def.validator is not None:
+                func_def.validator(arguments)
+            # 优先走注册时编译的专用分发器，否则通用关键字展开
             if func_def.func:
-                result: Any = func_def.func(**arguments)
-                # 如果结果是协程（异步函数），等待其完成
-                if hasattr(result, "__await__"):
-                    result = await result
+                if func_def.dispatch is not None:
+                    invoke = lambda: func_def.dispatch(arguments)
+                else:
+                    invoke = lambda: func_def.func(**arguments)
+                if iscoroutinefunction(func_def.func):
+                    result: Any = await invoke()
+                else:
+                    # 同步工具（数据库读写等）移到工作线程执行，
+                    # 不阻塞事件循环：并发分派的多个工具调用
+                    # 才能真正重叠各自的 I/O 等待。
+                    result = await asyncio.to_thread(invoke)
+                    # 保险：同步包装返回了可等待对象时仍正确处理
+                    if hasattr(result, "__await__"):
+                        result = await result
                 return result
             else:
                 raise ValueError(
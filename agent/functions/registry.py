@@ -10,6 +10,14 @@ from inspect import signature, Parameter
 import json
 from loguru import logger
 
+# 参数校验器：可用时在注册阶段把 JSON Schema 编译成专用校验函数
+# （fastjsonschema 生成直线代码，远快于通用的 Schema 解释器）；
+# 未安装时不做参数校验，行为与历史版本一致。
+try:
+    import fastjsonschema
+except ImportError:  # pragma: no cover - 取决于安装环境
+    fastjsonschema = None
+
 
 @dataclass
 class FunctionDefinition:
@@ -45,6 +53,11 @@ class FunctionDefinition:
     description: str
     parameters: Dict[str, Any]  # JSON Schema 格式
     func: Callable[..., Any]
+    # 注册时按 Schema 生成的专用分发函数（见 _compile_dispatch）；
+    # 无法生成时为 None，执行器退回通用的 func(**arguments)。
+    dispatch: Optional[Callable[[Dict[str, Any]], Any]] = None
+    # 注册时编译的参数校验器（fastjsonschema 可用时），否则 None。
+    validator: Optional[Callable[[Dict[str, Any]], Any]] = None
 
 
 class FunctionRegistry:
@@ -144,8 +157,72 @@ class FunctionRegistry:
             name=name,
             description=description,
             parameters=parameters,
-            func=func
+            func=func,
+            dispatch=self._compile_dispatch(func, parameters),
+            validator=self._compile_validator(name, parameters)
         )
+
+    @staticmethod
+    def _compile_validator(
+        name: str,
+        parameters: Dict[str, Any]
+    ) -> Optional[Callable[[Dict[str, Any]], Any]]:
+        """把参数 Schema 编译为专用校验函数（注册时一次性编译）。
+
+        Args:
+            name: 函数名称（用于日志）。
+            parameters: JSON Schema 格式的参数定义。
+
+        Returns:
+            校验函数，或 None（fastjsonschema 不可用/Schema 无法编译时，
+            执行器跳过校验）。
+        """
+        if fastjsonschema is None:
+            return None
+        try:
+            return fastjsonschema.compile(parameters)
+        except Exception as e:
+            logger.warning(
+                f"Cannot compile parameter schema for {name}: {e}"
+            )
+            return None
+
+    @staticmethod
+    def _compile_dispatch(
+        func: Callable[..., Any],
+        parameters: Dict[str, Any]
+    ) -> Optional[Callable[[Dict[str, Any]], Any]]:
+        """按参数 Schema 为函数生成专用分发器（注册时一次性编译）。
+
+        把通用的 ``func(**arguments)`` 按 Schema 的 properties 展开成
+        一段直线代码：每个已知参数一条 if 判断，未知键直接忽略。
+        每次工具调用省去通用 kwargs 匹配，还顺带过滤掉 LLM 幻觉出的
+        多余参数。属性名不是合法标识符等无法生成的情况返回 None。
+
+        Args:
+            func: 注册的函数对象。
+            parameters: JSON Schema 格式的参数定义。
+
+        Returns:
+            专用分发函数，或 None（由执行器退回通用调用路径）。
+        """
+        properties = parameters.get("properties")
+        if not isinstance(properties, dict):
+            return None
+        keys = list(properties)
+        if not all(
+            isinstance(k, str) and k.isidentifier() for k in keys
+        ):
+            return None
+
+        lines = ["def _dispatch(args):", "    kwargs = {}"]
+        for key in keys:
+            lines.append(f"    if {key!r} in args:")
+            lines.append(f"        kwargs[{key!r}] = args[{key!r}]")
+        lines.append("    return _func(**kwargs)")
+        namespace: Dict[str, Any] = {"_func": func}
+        exec("\n".join(lines), namespace)
+        return namespace["_dispatch"]
     
     def _infer_parameters(self, func: Callable[..., Any]) -> Dict[str, Any]:
         """从函数签名自动推断参数 Schema。
@@ -260,8 +337,12 @@ class FunctionRegistry:
         此方法返回所有已注册函数的列表，格式符合 LLM function calling
         的要求。每个函数包含 name、description 和 parameters 字段。
 
+        列表按函数名排序：发给 LLM 的工具 JSON 与注册顺序无关、
+        跨进程字节一致，服务端的提示词前缀缓存才能稳定命中
+        （注册处的代码重排不会使缓存失效）。
+
         Returns:
-            函数定义列表，每个元素是一个字典，包含：
+            函数定义列表（按 name 排序），每个元素是一个字典，包含：
             - name (str): 函数名称
             - description (str): 函数描述
             - parameters (Dict[str, Any]): 参数 Schema（JSON Schema 格式）
@@ -286,7 +367,7 @@ class FunctionRegistry:
                 "description": func.description,
                 "parameters": func.parameters
             }
-            for func in self._functions.values()
+            for _, func in sorted(self._functions.items())
         ]
     
     def has_function(self, name: str) -> bool:
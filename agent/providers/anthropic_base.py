@@ -19,12 +19,62 @@
                              default_max_tokens=4096)
     ```
 """
+import asyncio
+import weakref
+from importlib.util import find_spec
 from typing import List, Dict, Any, Optional, Tuple
-from anthropic import Anthropic
+
+import httpx
+from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
 from loguru import logger
 
 from agent.providers.base import LLMProvider, LLMMessage, LLMResponse, FunctionCall
 
+# 事件循环 → 共享 HTTP 客户端。弱引用键：循环被回收后对应的
+# 客户端也随之释放，不会留着绑定在死循环上的连接池。
+_loop_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, DefaultAsyncHttpxClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _build_http_client() -> DefaultAsyncHttpxClient:
+    """构建异步 HTTP 客户端（共享连接池配置）。
+
+    使用 SDK 自带的 DefaultAsyncHttpxClient 包装（而非裸的
+    httpx.AsyncClient），保持与 SDK 期望的传输层完全兼容。
+    """
+    return DefaultAsyncHttpxClient(
+        http2=find_spec("h2") is not None,
+        limits=httpx.Limits(
+            max_connections=32, max_keepalive_connections=16
+        ),
+        timeout=httpx.Timeout(60.0),
+    )
+
+
+def _shared_http_client() -> DefaultAsyncHttpxClient:
+    """当前事件循环共享的异步 HTTP 客户端。
+
+    同一循环内的所有 Anthropic 兼容提供商实例复用同一个连接池：
+    并发的 LLM 调用共享 keep-alive 连接（h2 可用时走 HTTP/2
+    多路复用），免去每个实例、每次调用各自的 TCP+TLS 握手。
+
+    按事件循环缓存而非进程级单例：httpx 的连接绑定在创建它们的
+    循环上，跨 asyncio.run() 边界（如 pytest-asyncio 为每个测试
+    新开的循环）复用旧池会在回收过期连接时触碰已关闭循环的传输
+    对象。无运行中循环时（同步构造路径）返回调用方独享的客户端，
+    其连接在首次实际使用的循环上建立。
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return _build_http_client()
+    client = _loop_http_clients.get(loop)
+    if client is None:
+        client = _build_http_client()
+        _loop_http_clients[loop] = client
+    return client
+
 
 class AnthropicBaseProvider(LLMProvider):
     """Anthropic SDK 兼容提供商基类。
@@ -45,7 +95,7 @@ class AnthropicBaseProvider(LLMProvider):
         完整的上下文，无需任何缓存或状态管理。
 
     Attributes:
-        client: Anthropic 客户端实例。
+        client: AsyncAnthropic 客户端实例（共享进程级连接池）。
         _model: 模型名称。
         _default_max_tokens: 默认最大 token 数。
     """
@@ -68,7 +118,20 @@ class AnthropicBaseProvider(LLMProvider):
         kwargs: Dict[str, Any] = {"api_key": api_key}
         if base_url:
             kwargs["base_url"] = base_url
-        self.client = Anthropic(**kwargs)
+        self._client_kwargs = kwargs
+        # 异步客户端：chat 真正挂起在网络 I/O 上而非阻塞
+        # 事件循环，gather 起来的并发调用才能实际重叠。
+        self.client = AsyncAnthropic(
+            http_client=_shared_http_client(), **kwargs
+        )
+        # 连接池所属的事件循环；构造时无运行中循环则留空，
+        # 由首次 chat() 绑定（见 _ensure_client_loop）。
+        try:
+            self._client_loop: Optional[asyncio.AbstractEventLoop] = (
+                asyncio.get_running_loop()
+            )
+        except RuntimeError:
+            self._client_loop = None
         self._model = model
         self._default_max_tokens = default_max_tokens
         logger.info(
@@ -86,6 +149,23 @@ class AnthropicBaseProvider(LLMProvider):
         """Anthropic 兼容模型均支持工具调用。"""
         return True
 
+    def _ensure_client_loop(self) -> None:
+        """确保 client 的连接池属于当前事件循环。
+
+        首次调用时记录当前循环；之后若在另一个循环下调用
+        （如多次 asyncio.run()），用当前循环的共享客户端重建
+        client——旧池的连接属于已关闭的循环，继续复用会在
+        httpx 回收过期连接时出错。
+        """
+        loop = asyncio.get_running_loop()
+        if self._client_loop is loop:
+            return
+        if self._client_loop is not None:
+            self.client = AsyncAnthropic(
+                http_client=_shared_http_client(), **self._client_kwargs
+            )
+        self._client_loop = loop
+
     # ================================================================
     # 消息格式转换
     # ================================================================
@@ -290,6 +370,9 @@ class AnthropicBaseProvider(LLMProvider):
             Exception: API 调用失败时抛出。
         """
         try:
+            # 连接池与当前事件循环对齐（跨 asyncio.run 边界时重建）
+            self._ensure_client_loop()
+
             # 提取 system 消息
             system_text, non_system_messages = self._extract_system(messages)
 
@@ -306,9 +389,19 @@ class AnthropicBaseProvider(LLMProvider):
                 "messages": api_messages,
                 **kwargs,
             }
+            # system 与 tools 是每次请求都原样重发的固定前缀，
+            # 标记为可缓存（ephemeral）后，服务端只在首次请求时
+            # 计全价，后续请求命中前缀缓存、按缓存价计费。
+            # 命中情况可在 usage 的 cache_read_input_tokens 中观察。
             if system_text:
-                request_params["system"] = system_text
+                request_params["system"] = [{
+                    "type": "text",
+                    "text": system_text,
+                    "cache_control": {"type": "ephemeral"},
+                }]
             if tools:
+                # 缓存断点加在最后一个工具上，覆盖整个工具列表
+                tools[-1]["cache_control"] = {"type": "ephemeral"}
                 request_params["tools"] = tools
 
             logger.debug(
@@ -317,7 +410,7 @@ class AnthropicBaseProvider(LLMProvider):
             )
 
             # 调用 API
-            response = self.client.messages.create(**request_params)
+            response = await self.client.messages.create(**request_params)
 
             return self._parse_response(response)
 
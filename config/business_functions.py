@@ -47,7 +47,7 @@ def _parse_date(date_str: Optional[str] = None) -> date:
     if not date_str:
         return date.today()
     try:
-        return datetime.strptime(date_str, "%Y-%m-%d").date()
+        return date.fromisoformat(date_str)
     except ValueError:
         return date.today()
 
@@ -8,6 +8,7 @@
 - 未传入 session 时自动创建并管理会话生命周期
 - 返回 ORM 对象，供上层按需转换为字典
 """
+from collections import OrderedDict
 from typing import Optional, List, Dict, Any, Type, TypeVar, Union
 from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -17,6 +18,9 @@ from .connection import DatabaseConnection
 # 泛型类型变量，表示任意 SQLAlchemy 模型
 T = TypeVar("T")
 
+# 自然键缓存的容量上限（LRU 淘汰），防止长期运行时无界增长
+_NAME_CACHE_MAX = 1024
+
 
 class BaseCRUD:
     """通用 CRUD 操作基类。
@@ -42,11 +46,39 @@ class BaseCRUD:
             conn: DatabaseConnection 实例。
         """
         self.conn = conn
+        # 进程内自然键缓存：名称 → 记录ID。get_or_create 重复解析
+        # 同名实体时走主键快路径，替代每次的条件 SELECT 往返。
+        self._name_cache: "OrderedDict[str, int]" = OrderedDict()
 
     def _get_session(self) -> Union[Session, AsyncSession]:
         """获取数据库会话（内部使用）。"""
         return self.conn.get_session()
 
+    def _cached_by_name(self, sess: Session, model_class: Type[T],
+                        name: str) -> Optional[T]:
+        """按自然键缓存查找记录（内部使用）。
+
+        命中缓存时通过主键读取（暖识别映射下不发 SQL）；
+        若记录已不存在或名称不符（如事务回滚后ID被复用），
+        则丢弃过期缓存并返回 None，由调用方回退到条件查询。
+        """
+        cached_id = self._name_cache.get(name)
+        if cached_id is None:
+            return None
+        instance = sess.get(model_class, cached_id)
+        if instance is not None and instance.name == name:
+            self._name_cache.move_to_end(name)
+            return instance
+        self._name_cache.pop(name, None)
+        return None
+
+    def _remember_name(self, name: str, record_id: int) -> None:
+        """写入自然键缓存（内部使用，LRU 淘汰最久未用项）。"""
+        self._name_cache[name] = record_id
+        self._name_cache.move_to_end(name)
+        while len(self._name_cache) > _NAME_CACHE_MAX:
+            self._name_cache.popitem(last=False)
+
     # ========== 查询操作 ==========
 
     def get_by_id(self, model_class: Type[T], record_id: int,
@@ -62,14 +94,10 @@ class BaseCRUD:
             模型实例，不存在则返回 None。
         """
         if session:
-            return session.query(model_class).filter(
-                model_class.id == record_id
-            ).first()
+            return session.get(model_class, record_id)
 
         with self._get_session() as sess:
-            return sess.query(model_class).filter(
-                model_class.id == record_id
-            ).first()
+            return sess.get(model_class, record_id)
 
     def get_all(self, model_class: Type[T],
                 filters: Optional[Dict[str, Any]] = None,
@@ -178,9 +206,7 @@ class BaseCRUD:
             # 重新查询以避免 detached instance 问题
             record_id = instance.id
         with self._get_session() as sess:
-            return sess.query(model_class).filter(
-                model_class.id == record_id
-            ).first()
+            return sess.get(model_class, record_id)
 
     def get_or_create(self, model_class: Type[T],
                       lookup: Dict[str, Any],
@@ -223,9 +249,7 @@ class BaseCRUD:
             sess.commit()
             record_id = instance.id
         with self._get_session() as sess:
-            return sess.query(model_class).filter(
-                model_class.id == record_id
-            ).first()
+            return sess.get(model_class, record_id)
 
     # ========== 更新操作 ==========
 
@@ -244,9 +268,7 @@ class BaseCRUD:
             更新后的模型实例，不存在则返回 None。
         """
         def _do(sess):
-            instance = sess.query(model_class).filter(
-                model_class.id == record_id
-            ).first()
+            instance = sess.get(model_class, record_id)
             if instance:
                 for key, value in kwargs.items():
                     if hasattr(instance, key):
@@ -269,9 +291,7 @@ class BaseCRUD:
             else:
                 return None
         with self._get_session() as sess:
-            return sess.query(model_class).filter(
-                model_class.id == final_id
-            ).first()
+            return sess.get(model_class, final_id)
 
     # ========== 删除操作 ==========
 
@@ -288,9 +308,7 @@ class BaseCRUD:
             是否成功删除。
         """
         def _do(sess):
-            instance = sess.query(model_class).filter(
-                model_class.id == record_id
-            ).first()
+            instance = sess.get(model_class, record_id)
             if instance:
                 sess.delete(instance)
                 return True
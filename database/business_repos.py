@@ -8,6 +8,7 @@
 """
 from typing import Optional, List, Dict, Any
 from datetime import date, datetime
+from sqlalchemy import update, func
 from sqlalchemy.orm import Session
 from loguru import logger
 
@@ -47,7 +48,8 @@ class ServiceRecordRepository(BaseCRUD):
         self._channels = channel_repo
 
     def save(self, record_data: Dict[str, Any],
-             raw_message_id: int) -> int:
+             raw_message_id: int,
+             session: Optional[Session] = None) -> int:
         """保存服务记录。
 
         自动处理关联实体的创建（顾客、服务类型、员工、渠道）。
@@ -68,6 +70,7 @@ class ServiceRecordRepository(BaseCRUD):
                 - confirmed: 是否已确认（可选，默认False）
                 - extra_data: 扩展数据（可选）
             raw_message_id: 关联的原始消息ID。
+            session: 外部会话（可选，用于事务组合）。
 
         Returns:
             新创建的服务记录ID。
@@ -75,7 +78,7 @@ class ServiceRecordRepository(BaseCRUD):
         Raises:
             ValueError: 日期格式无效或缺失。
         """
-        with self._get_session() as session:
+        def _do(session):
             # 自动创建关联实体
             customer = self._customers.get_or_create(
                 record_data.get("customer_name", ""), session=session
@@ -133,10 +136,17 @@ class ServiceRecordRepository(BaseCRUD):
             )
 
             session.add(record)
-            session.commit()
-            session.refresh(record)
+            session.flush()
             return record.id
 
+        if session:
+            return _do(session)
+
+        with self._get_session() as sess:
+            record_id = _do(sess)
+            sess.commit()
+            return record_id
+
     def get_by_date(self, target_date: date,
                     session: Optional[Session] = None
                     ) -> List[Dict[str, Any]]:
@@ -217,7 +227,7 @@ class ServiceRecordRepository(BaseCRUD):
             return date_value
         if isinstance(date_value, str):
             try:
-                return datetime.strptime(date_value, "%Y-%m-%d").date()
+                return date.fromisoformat(date_value)
             except ValueError:
                 raise ValueError(
                     f"Invalid date format: {date_value}, "
@@ -243,7 +253,8 @@ class ProductSaleRepository(BaseCRUD):
         self._products = product_repo
 
     def save(self, sale_data: Dict[str, Any],
-             raw_message_id: int) -> int:
+             raw_message_id: int,
+             session: Optional[Session] = None) -> int:
         """保存商品销售记录。
 
         自动处理关联实体的创建。
@@ -262,11 +273,12 @@ class ProductSaleRepository(BaseCRUD):
                 - confidence: 置信度（可选，默认0.5）
                 - confirmed: 是否确认（可选，默认False）
             raw_message_id: 关联的原始消息ID。
+            session: 外部会话（可选，用于事务组合）。
 
         Returns:
             新创建的销售记录ID。
         """
-        with self._get_session() as session:
+        def _do(session):
             product = self._products.get_or_create(
                 sale_data.get("service_or_product", ""),
                 sale_data.get("category"),
@@ -306,10 +318,17 @@ class ProductSaleRepository(BaseCRUD):
             )
 
             session.add(sale)
-            session.commit()
-            session.refresh(sale)
+            session.flush()
             return sale.id
 
+        if session:
+            return _do(session)
+
+        with self._get_session() as sess:
+            sale_id = _do(sess)
+            sess.commit()
+            return sale_id
+
     def get_by_date(self, target_date: date,
                     session: Optional[Session] = None
                     ) -> List[Dict[str, Any]]:
@@ -367,7 +386,8 @@ class MembershipRepository(BaseCRUD):
         self._customers = customer_repo
 
     def save(self, membership_data: Dict[str, Any],
-             raw_message_id: int) -> int:
+             raw_message_id: int,
+             session: Optional[Session] = None) -> int:
         """保存会员卡记录（开卡）。
 
         自动处理顾客的创建。
@@ -380,12 +400,14 @@ class MembershipRepository(BaseCRUD):
                 - card_type: 卡类型（可选，默认"储值卡"）
                 - remaining_sessions: 剩余次数（可选）
                 - expires_at: 到期日期（可选）
+                - points: 初始积分（可选，默认0）
             raw_message_id: 关联的原始消息ID。
+            session: 外部会话（可选，用于事务组合）。
 
         Returns:
             新创建的会员卡ID。
         """
-        with self._get_session() as session:
+        def _do(session):
             customer = self._customers.get_or_create(
                 membership_data.get("customer_name", ""), session=session
             )
@@ -407,14 +429,22 @@ class MembershipRepository(BaseCRUD):
                 balance=membership_data.get("amount", 0),
                 remaining_sessions=membership_data.get("remaining_sessions"),
                 opened_at=opened_at,
-                expires_at=expires_at
+                expires_at=expires_at,
+                points=membership_data.get("points", 0)
             )
 
             session.add(membership)
-            session.commit()
-            session.refresh(membership)
+            session.flush()
             return membership.id
 
+        if session:
+            return _do(session)
+
+        with self._get_session() as sess:
+            membership_id = _do(sess)
+            sess.commit()
+            return membership_id
+
     def get_active_by_customer(self, customer_id: int,
                                session: Optional[Session] = None
                                ) -> List[Membership]:
@@ -445,13 +475,10 @@ class MembershipRepository(BaseCRUD):
             更新后的 Membership 对象，余额不足返回 None。
         """
         def _do(sess):
-            membership = sess.query(Membership).filter(
-                Membership.id == membership_id
-            ).first()
+            membership = sess.get(Membership, membership_id)
             if membership and float(membership.balance) >= amount:
                 membership.balance = float(membership.balance) - amount
                 sess.flush()
-                sess.refresh(membership)
                 return membership
             return None
 
@@ -466,9 +493,7 @@ class MembershipRepository(BaseCRUD):
             else:
                 return None
         with self._get_session() as sess:
-            return sess.query(Membership).filter(
-                Membership.id == mid
-            ).first()
+            return sess.get(Membership, mid)
 
     def deduct_session(self, membership_id: int, count: int = 1,
                        session: Optional[Session] = None
@@ -483,15 +508,12 @@ class MembershipRepository(BaseCRUD):
             更新后的 Membership 对象，次数不足返回 None。
         """
         def _do(sess):
-            membership = sess.query(Membership).filter(
-                Membership.id == membership_id
-            ).first()
+            membership = sess.get(Membership, membership_id)
             if (membership
                     and membership.remaining_sessions is not None
                     and membership.remaining_sessions >= count):
                 membership.remaining_sessions -= count
                 sess.flush()
-                sess.refresh(membership)
                 return membership
             return None
 
@@ -506,9 +528,57 @@ class MembershipRepository(BaseCRUD):
             else:
                 return None
         with self._get_session() as sess:
-            return sess.query(Membership).filter(
-                Membership.id == mid
-            ).first()
+            return sess.get(Membership, mid)
+
+    def apply_usage(self, membership_id: int,
+                    balance_delta: float = 0,
+                    sessions_delta: int = 0,
+                    points_delta: int = 0,
+                    session: Optional[Session] = None
+                    ) -> Optional[Membership]:
+        """一次性应用会员卡使用产生的变动（余额/次数/积分）。
+
+        将 deduct_balance + deduct_session + add_points 合并为
+        单条 UPDATE 语句，减少往返和对会员卡行的加锁次数。
+        单独的变动仍可使用对应的独立方法。
+
+        Args:
+            membership_id: 会员卡ID。
+            balance_delta: 扣减的余额，默认0。
+            sessions_delta: 扣减的次数，默认0。
+            points_delta: 增加的积分，默认0。
+
+        Returns:
+            更新后的 Membership 对象，会员卡不存在返回 None。
+        """
+        def _do(sess):
+            values: Dict[str, Any] = {}
+            if balance_delta:
+                values["balance"] = Membership.balance - balance_delta
+            if sessions_delta:
+                values["remaining_sessions"] = (
+                    Membership.remaining_sessions - sessions_delta
+                )
+            if points_delta:
+                values["points"] = (
+                    func.coalesce(Membership.points, 0) + points_delta
+                )
+            if values:
+                sess.execute(
+                    update(Membership)
+                    .where(Membership.id == membership_id)
+                    .values(**values)
+                )
+
+        if session:
+            _do(session)
+            return session.get(Membership, membership_id)
+
+        with self._get_session() as sess:
+            _do(sess)
+            sess.commit()
+        with self._get_session() as sess:
+            return sess.get(Membership, membership_id)
 
     def add_points(self, membership_id: int, points: int,
                    session: Optional[Session] = None
@@ -523,13 +593,10 @@ class MembershipRepository(BaseCRUD):
             更新后的 Membership 对象。
         """
         def _do(sess):
-            membership = sess.query(Membership).filter(
-                Membership.id == membership_id
-            ).first()
+            membership = sess.get(Membership, membership_id)
             if membership:
                 membership.points = (membership.points or 0) + points
                 sess.flush()
-                sess.refresh(membership)
             return membership
 
         if session:
@@ -543,7 +610,5 @@ class MembershipRepository(BaseCRUD):
             else:
                 return None
         with self._get_session() as sess:
-            return sess.query(Membership).filter(
-                Membership.id == mid
-            ).first()
+            return sess.get(Membership, mid)
 
@@ -8,15 +8,45 @@
 
 本模块不包含任何业务逻辑，仅提供数据库基础操作。
 """
+import json
 import os
+from functools import lru_cache
 from typing import Optional, Union, Any
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from .models import Base
 from config.settings import settings
 
+# JSON 列的序列化器：优先使用 orjson（编码比标准库快约 5-10 倍，
+# 插件数据与修正记录的 JSON 字段读写是热路径），未安装时退回
+# 标准库的紧凑编码。
+try:
+    import orjson
+
+    def _json_dumps(value: Any) -> str:
+        return orjson.dumps(value).decode()
+
+    def _json_loads(value: Any) -> Any:
+        # SQLite 的 JSON 标量可能以数值亲和性落盘，读回的已是
+        # Python 数值而非 JSON 文本，直接返回即可。
+        if isinstance(value, (str, bytes)):
+            return orjson.loads(value)
+        return value
+except ImportError:  # pragma: no cover - 取决于安装环境
+    def _json_dumps(value: Any) -> str:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+    _json_loads = json.loads
+
+
+@lru_cache(maxsize=256)
+def _compiled_text(sql: str):
+    """缓存已构建的 TextClause，避免重复解析同一条 SQL。"""
+    return text(sql)
+
 
 class DatabaseConnection:
     """数据库连接管理器。
@@ -63,11 +93,34 @@ class DatabaseConnection:
                 db_dir = os.path.dirname(db_path)
                 if db_dir:
                     os.makedirs(db_dir, exist_ok=True)
-            self.engine = create_engine(
-                self.database_url,
-                echo=False,
-                connect_args={"check_same_thread": False}
-            )
+            engine_kwargs: dict = {
+                "echo": False,
+                "connect_args": {"check_same_thread": False},
+                # 批量写入（如 save_raw_messages_bulk）单页最多 1000 行
+                "insertmanyvalues_page_size": 1000,
+                "json_serializer": _json_dumps,
+                "json_deserializer": _json_loads,
+            }
+            if not db_path or db_path == ":memory:":
+                # 内存库必须所有会话共享同一个连接，否则每个连接
+                # 各自看到一个空库（多线程测试场景尤其如此）；
+                # StaticPool 也免去了每次取连接的 open/close 开销。
+                engine_kwargs["poolclass"] = StaticPool
+            self.engine = create_engine(self.database_url, **engine_kwargs)
+            if db_path and db_path != ":memory:":
+                # 文件库的写性能调优：默认 journal_mode=DELETE +
+                # synchronous=FULL 每次提交都 fsync，高频小事务时
+                # fsync 占据了数据库耗时的大头。WAL 允许读写并发、
+                # 顺序追加日志；NORMAL 在 WAL 下仍保证崩溃一致性，
+                # 只是掉电可能丢最后一次提交（本地业务库可接受）。
+                @event.listens_for(self.engine, "connect")
+                def _set_sqlite_pragmas(dbapi_conn, _record):
+                    cursor = dbapi_conn.cursor()
+                    cursor.execute("PRAGMA journal_mode=WAL")
+                    cursor.execute("PRAGMA synchronous=NORMAL")
+                    cursor.execute("PRAGMA temp_store=MEMORY")
+                    cursor.execute("PRAGMA mmap_size=268435456")
+                    cursor.close()
             self.SessionLocal = sessionmaker(
                 bind=self.engine, autocommit=False, autoflush=False
             )
@@ -76,7 +129,16 @@ class DatabaseConnection:
             async_url = self.database_url.replace(
                 "postgresql://", "postgresql+asyncpg://"
             )
-            self.engine = create_async_engine(async_url, echo=False)
+            # LIFO 取连接：优先复用最近归还的连接，保持其预编译语句
+            # 与缓存处于热状态，并让空闲连接自然超时回收。
+            # pre_ping 只在长连接可能被服务端掐断的网络库场景开启；
+            # SQLite 本地连接无此问题，保持默认关闭。
+            self.engine = create_async_engine(
+                async_url, echo=False, pool_use_lifo=True,
+                pool_pre_ping=True,
+                json_serializer=_json_dumps,
+                json_deserializer=_json_loads,
+            )
             self.SessionLocal = async_sessionmaker(
                 self.engine, class_=AsyncSession
             )
@@ -115,7 +177,7 @@ class DatabaseConnection:
             Exception: 如果SQL执行失败。
         """
         with self.get_session() as session:
-            result = session.execute(text(sql), params or {})
+            result = session.execute(_compiled_text(sql), params or {})
             session.commit()
             return result
 
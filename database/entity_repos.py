@@ -6,7 +6,7 @@
 每个仓库继承 BaseCRUD 获得通用能力，并添加领域特定的查询方法。
 """
 from typing import Optional, List
-from sqlalchemy import or_
+from sqlalchemy import insert, or_
 from sqlalchemy.orm import Session
 
 from .base_crud import BaseCRUD
@@ -41,14 +41,16 @@ class StaffRepository(BaseCRUD):
             Employee 对象。
         """
         def _do(sess):
-            employee = sess.query(Employee).filter(
-                Employee.name == name
-            ).first()
+            employee = self._cached_by_name(sess, Employee, name)
+            if not employee:
+                employee = sess.query(Employee).filter(
+                    Employee.name == name
+                ).first()
             if not employee:
                 employee = Employee(name=name)
                 sess.add(employee)
                 sess.flush()
-                sess.refresh(employee)
+            self._remember_name(name, employee.id)
             return employee
 
         if session:
@@ -59,9 +61,7 @@ class StaffRepository(BaseCRUD):
             sess.commit()
             employee_id = employee.id
         with self._get_session() as sess:
-            return sess.query(Employee).filter(
-                Employee.id == employee_id
-            ).first()
+            return sess.get(Employee, employee_id)
 
     def get_active_staff(self,
                          session: Optional[Session] = None) -> List[Employee]:
@@ -131,14 +131,16 @@ class CustomerRepository(BaseCRUD):
             Customer 对象。
         """
         def _do(sess):
-            customer = sess.query(Customer).filter(
-                Customer.name == name
-            ).first()
+            customer = self._cached_by_name(sess, Customer, name)
+            if not customer:
+                customer = sess.query(Customer).filter(
+                    Customer.name == name
+                ).first()
             if not customer:
                 customer = Customer(name=name)
                 sess.add(customer)
                 sess.flush()
-                sess.refresh(customer)
+            self._remember_name(name, customer.id)
             return customer
 
         if session:
@@ -149,9 +151,49 @@ class CustomerRepository(BaseCRUD):
             sess.commit()
             customer_id = customer.id
         with self._get_session() as sess:
-            return sess.query(Customer).filter(
-                Customer.id == customer_id
-            ).first()
+            return sess.get(Customer, customer_id)
+
+    def ensure_many(self, names: List[str],
+                    session: Optional[Session] = None) -> List[int]:
+        """批量获取或创建顾客（按姓名匹配）。
+
+        整批只需两条语句：一条 IN 查询找出已存在的顾客，
+        一次 executemany INSERT 补齐缺失的，替代逐个
+        get_or_create 的多次往返。适合批量导入顾客名单。
+
+        Args:
+            names: 顾客姓名列表。
+            session: 外部会话（可选）。
+
+        Returns:
+            顾客ID列表，顺序与 names 一致。
+        """
+        def _do(sess):
+            existing = {
+                name: cid
+                for cid, name in sess.query(
+                    Customer.id, Customer.name
+                ).filter(Customer.name.in_(names)).all()
+            }
+            missing = [n for n in names if n not in existing]
+            if missing:
+                sess.execute(
+                    insert(Customer), [{"name": n} for n in missing]
+                )
+                sess.flush()
+                for cid, name in sess.query(
+                    Customer.id, Customer.name
+                ).filter(Customer.name.in_(missing)).all():
+                    existing[name] = cid
+            return [existing[n] for n in names]
+
+        if session:
+            return _do(session)
+
+        with self._get_session() as sess:
+            ids = _do(sess)
+            sess.commit()
+            return ids
 
     def search(self, keyword: str,
                session: Optional[Session] = None) -> List[Customer]:
@@ -207,9 +249,11 @@ class ServiceTypeRepository(BaseCRUD):
             ServiceType 对象。
         """
         def _do(sess):
-            service_type = sess.query(ServiceType).filter(
-                ServiceType.name == name
-            ).first()
+            service_type = self._cached_by_name(sess, ServiceType, name)
+            if not service_type:
+                service_type = sess.query(ServiceType).filter(
+                    ServiceType.name == name
+                ).first()
             if not service_type:
                 service_type = ServiceType(
                     name=name,
@@ -218,7 +262,7 @@ class ServiceTypeRepository(BaseCRUD):
                 )
                 sess.add(service_type)
                 sess.flush()
-                sess.refresh(service_type)
+            self._remember_name(name, service_type.id)
             return service_type
 
         if session:
@@ -229,9 +273,7 @@ class ServiceTypeRepository(BaseCRUD):
             sess.commit()
             st_id = service_type.id
         with self._get_session() as sess:
-            return sess.query(ServiceType).filter(
-                ServiceType.id == st_id
-            ).first()
+            return sess.get(ServiceType, st_id)
 
     def get_by_category(self, category: str,
                         session: Optional[Session] = None) -> List[ServiceType]:
@@ -277,16 +319,18 @@ class ProductRepository(BaseCRUD):
             Product 对象。
         """
         def _do(sess):
-            product = sess.query(Product).filter(
-                Product.name == name
-            ).first()
+            product = self._cached_by_name(sess, Product, name)
+            if not product:
+                product = sess.query(Product).filter(
+                    Product.name == name
+                ).first()
             if not product:
                 product = Product(
                     name=name, category=category, unit_price=unit_price
                 )
                 sess.add(product)
                 sess.flush()
-                sess.refresh(product)
+            self._remember_name(name, product.id)
             return product
 
         if session:
@@ -297,9 +341,7 @@ class ProductRepository(BaseCRUD):
             sess.commit()
             product_id = product.id
         with self._get_session() as sess:
-            return sess.query(Product).filter(
-                Product.id == product_id
-            ).first()
+            return sess.get(Product, product_id)
 
     def get_low_stock(self,
                       session: Optional[Session] = None) -> List[Product]:
@@ -331,13 +373,10 @@ class ProductRepository(BaseCRUD):
             更新后的 Product 对象。
         """
         def _do(sess):
-            product = sess.query(Product).filter(
-                Product.id == product_id
-            ).first()
+            product = sess.get(Product, product_id)
             if product:
                 product.stock_quantity += quantity_change
                 sess.flush()
-                sess.refresh(product)
             return product
 
         if session:
@@ -351,7 +390,7 @@ class ProductRepository(BaseCRUD):
             else:
                 return None
         with self._get_session() as sess:
-            return sess.query(Product).filter(Product.id == pid).first()
+            return sess.get(Product, pid)
 
 
 class ChannelRepository(BaseCRUD):
@@ -384,9 +423,11 @@ class ChannelRepository(BaseCRUD):
             ReferralChannel 对象。
         """
         def _do(sess):
-            channel = sess.query(ReferralChannel).filter(
-                ReferralChannel.name == name
-            ).first()
+            channel = self._cached_by_name(sess, ReferralChannel, name)
+            if not channel:
+                channel = sess.query(ReferralChannel).filter(
+                    ReferralChannel.name == name
+                ).first()
             if not channel:
                 channel = ReferralChannel(
                     name=name,
@@ -396,7 +437,7 @@ class ChannelRepository(BaseCRUD):
                 )
                 sess.add(channel)
                 sess.flush()
-                sess.refresh(channel)
+            self._remember_name(name, channel.id)
             return channel
 
         if session:
@@ -407,9 +448,59 @@ class ChannelRepository(BaseCRUD):
             sess.commit()
             channel_id = channel.id
         with self._get_session() as sess:
-            return sess.query(ReferralChannel).filter(
-                ReferralChannel.id == channel_id
-            ).first()
+            return sess.get(ReferralChannel, channel_id)
+
+    def ensure_many(self, pairs: List[tuple],
+                    session: Optional[Session] = None) -> List[int]:
+        """批量获取或创建引流渠道（按名称匹配）。
+
+        整批只需两条语句：一条 IN 查询找出已存在的渠道，
+        一次 executemany INSERT 补齐缺失的，替代逐个
+        get_or_create 的多次往返。适合批量初始化渠道配置。
+
+        Args:
+            pairs: (渠道名称, 渠道类型) 元组列表。
+            session: 外部会话（可选）。
+
+        Returns:
+            渠道ID列表，顺序与 pairs 一致。
+        """
+        names = [name for name, _ in pairs]
+
+        def _do(sess):
+            existing = {
+                name: cid
+                for cid, name in sess.query(
+                    ReferralChannel.id, ReferralChannel.name
+                ).filter(ReferralChannel.name.in_(names)).all()
+            }
+            missing = [
+                (n, t) for n, t in pairs if n not in existing
+            ]
+            if missing:
+                sess.execute(
+                    insert(ReferralChannel),
+                    [
+                        {"name": n, "channel_type": t}
+                        for n, t in missing
+                    ],
+                )
+                sess.flush()
+                for cid, name in sess.query(
+                    ReferralChannel.id, ReferralChannel.name
+                ).filter(
+                    ReferralChannel.name.in_([n for n, _ in missing])
+                ).all():
+                    existing[name] = cid
+            return [existing[n] for n in names]
+
+        if session:
+            return _do(session)
+
+        with self._get_session() as sess:
+            ids = _do(sess)
+            sess.commit()
+            return ids
 
     def get_active_channels(self, channel_type: Optional[str] = None,
                             is_active: Optional[bool] = True,
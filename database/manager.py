@@ -16,8 +16,11 @@ DatabaseManager 是 database 模块的统一入口，组合了所有子仓库，
 - 模块相对独立，可单独使用
 - 便捷方法覆盖高频操作，低频操作通过子仓库访问
 """
-from typing import Optional, List, Dict, Any, Union
+import contextvars
+from contextlib import contextmanager
+from typing import Iterator, Optional, List, Dict, Any, Union
 from datetime import date, datetime
+from sqlalchemy import select, literal, literal_column, null, union_all
 from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -32,7 +35,10 @@ from .business_repos import (
 from .system_repos import (
     MessageRepository, SummaryRepository, PluginRepository
 )
-from .models import Employee, Membership
+from .models import (
+    Employee, Membership, ServiceRecord, ProductSale,
+    Customer, ServiceType, Product
+)
 
 
 class DatabaseManager:
@@ -101,6 +107,15 @@ class DatabaseManager:
         self.summaries = SummaryRepository(self.conn)
         self.plugins = PluginRepository(self.conn)
 
+        # bulk_context() 激活时的共享会话，便捷写入方法会复用它。
+        # 用 ContextVar 而非裸实例属性：asyncio 任务和 to_thread
+        # 工作线程各自持有上下文副本，并发的工具调用各开各的
+        # bulk_context() 互不可见，不会把别人事务中的会话顶掉
+        # （SQLAlchemy 会话不是线程安全的）。
+        self._bulk_session_var: contextvars.ContextVar[
+            Optional[Session]
+        ] = contextvars.ContextVar("bizbot_bulk_session", default=None)
+
     # ================================================================
     # 基础设施方法
     # ================================================================
@@ -147,6 +162,41 @@ class DatabaseManager:
         """关闭数据库连接，释放所有资源。"""
         self.conn.close()
 
+    @property
+    def _bulk_session(self) -> Optional[Session]:
+        """当前上下文激活的批量写入会话（无则为 None）。"""
+        return self._bulk_session_var.get()
+
+    @contextmanager
+    def bulk_context(self) -> Iterator[None]:
+        """批量写入上下文：合并多次便捷写入为一个事务。
+
+        上下文内的 ``save_raw_message()``、``save_service_record()`` 等
+        便捷写入方法共享同一个会话，退出时一次性提交，
+        替代逐条"开会话—提交—关会话"的多次往返（消息回填等批量场景）。
+
+        会话绑定是上下文局部的：并发的 asyncio 任务或 to_thread
+        工作线程各自进入 bulk_context() 时互不干扰，每个上下文
+        独享自己的会话和事务边界。
+
+        Example::
+
+            with db.bulk_context():
+                for msg in batch:
+                    db.save_raw_message(msg)
+        """
+        session = self.conn.get_session()
+        token = self._bulk_session_var.set(session)
+        try:
+            yield
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            self._bulk_session_var.reset(token)
+            session.close()
+
     # ================================================================
     # 便捷写入方法
     # ================================================================
@@ -160,7 +210,23 @@ class DatabaseManager:
         Returns:
             消息记录 ID。
         """
-        return self.messages.save_raw_message(msg_data)
+        return self.messages.save_raw_message(
+            msg_data, session=self._bulk_session
+        )
+
+    def save_raw_messages_bulk(
+        self, msgs: List[Dict[str, Any]]
+    ) -> List[int]:
+        """批量保存原始消息（自动去重）。
+
+        Args:
+            msgs: 消息数据字典列表，详见
+                MessageRepository.save_raw_messages_bulk。
+
+        Returns:
+            消息记录 ID 列表，顺序与 msgs 一致。
+        """
+        return self.messages.save_raw_messages_bulk(msgs)
 
     def update_parse_status(self, msg_id: int, status: str,
                             result: Optional[Dict[str, Any]] = None,
@@ -173,7 +239,9 @@ class DatabaseManager:
             result: 解析结果字典（可选）。
             error: 解析错误信息（可选）。
         """
-        self.messages.update_parse_status(msg_id, status, result, error)
+        self.messages.update_parse_status(
+            msg_id, status, result, error, session=self._bulk_session
+        )
 
     def save_service_record(self, record_data: Dict[str, Any],
                             raw_message_id: int) -> int:
@@ -188,7 +256,9 @@ class DatabaseManager:
         Returns:
             新创建的服务记录 ID。
         """
-        return self.service_records.save(record_data, raw_message_id)
+        return self.service_records.save(
+            record_data, raw_message_id, session=self._bulk_session
+        )
 
     def save_product_sale(self, sale_data: Dict[str, Any],
                           raw_message_id: int) -> int:
@@ -203,7 +273,9 @@ class DatabaseManager:
         Returns:
             新创建的销售记录 ID。
         """
-        return self.product_sales.save(sale_data, raw_message_id)
+        return self.product_sales.save(
+            sale_data, raw_message_id, session=self._bulk_session
+        )
 
     def save_membership(self, membership_data: Dict[str, Any],
                         raw_message_id: int) -> int:
@@ -218,7 +290,9 @@ class DatabaseManager:
         Returns:
             新创建的会员卡 ID。
         """
-        return self.memberships.save(membership_data, raw_message_id)
+        return self.memberships.save(
+            membership_data, raw_message_id, session=self._bulk_session
+        )
 
     def save_daily_summary(self, summary_date: date,
                            summary_data: Dict[str, Any]) -> int:
@@ -237,7 +311,33 @@ class DatabaseManager:
     # 便捷查询方法
     # ================================================================
 
-    def get_daily_records(self, target_date: Union[str, date]
+    def fetch_one(self, model_class, **filters) -> Optional[Any]:
+        """按条件查询单条记录（便捷方法）。
+
+        bulk_context() 内复用共享会话（暖识别映射下主键条件不发 SQL），
+        否则开一个短会话完成查询，免去调用方手动管理会话生命周期。
+
+        Args:
+            model_class: ORM 模型类。
+            **filters: 字段等值过滤条件（如 ``id=3``、``name="张三"``）。
+
+        Returns:
+            模型实例，不存在则返回 None。
+        """
+        def _query(sess):
+            query = sess.query(model_class)
+            for key, value in filters.items():
+                query = query.filter(getattr(model_class, key) == value)
+            return query.first()
+
+        if self._bulk_session is not None:
+            return _query(self._bulk_session)
+
+        with self.conn.get_session() as sess:
+            return _query(sess)
+
+    def get_daily_records(self, target_date: Union[str, date],
+                          limit: Optional[int] = None
                           ) -> List[Dict[str, Any]]:
         """获取指定日期的所有经营记录。
 
@@ -245,16 +345,101 @@ class DatabaseManager:
 
         Args:
             target_date: 日期，支持 ``YYYY-MM-DD`` 字符串或 date 对象。
+            limit: 最多返回的记录数（可选）。在 SQL 层截断，
+                避免把整天的行都拉回来再丢弃。
 
         Returns:
             记录列表，每条记录包含 type、id、customer_name、amount 等字段。
         """
         if isinstance(target_date, str):
-            target_date = datetime.strptime(target_date, "%Y-%m-%d").date()
+            target_date = date.fromisoformat(target_date)
+
+        # 单条 UNION ALL 语句合并服务记录与销售记录，
+        # 避免两次独立查询的往返开销（汇总生成的热路径）。
+        service_stmt = (
+            select(
+                literal("service").label("type"),
+                ServiceRecord.id.label("id"),
+                Customer.name.label("customer_name"),
+                ServiceType.name.label("item_name"),
+                ServiceRecord.amount.label("amount"),
+                ServiceRecord.commission_amount.label("commission"),
+                ServiceRecord.commission_to.label("commission_to"),
+                ServiceRecord.net_amount.label("net_amount"),
+                null().label("total_amount"),
+                null().label("quantity"),
+                ServiceRecord.confirmed.label("confirmed"),
+            )
+            .outerjoin(Customer, ServiceRecord.customer_id == Customer.id)
+            .outerjoin(
+                ServiceType,
+                ServiceRecord.service_type_id == ServiceType.id
+            )
+            .where(ServiceRecord.service_date == target_date)
+        )
+        sale_stmt = (
+            select(
+                literal("product_sale").label("type"),
+                ProductSale.id.label("id"),
+                Customer.name.label("customer_name"),
+                Product.name.label("item_name"),
+                null().label("amount"),
+                null().label("commission"),
+                null().label("commission_to"),
+                null().label("net_amount"),
+                ProductSale.total_amount.label("total_amount"),
+                ProductSale.quantity.label("quantity"),
+                ProductSale.confirmed.label("confirmed"),
+            )
+            .outerjoin(Customer, ProductSale.customer_id == Customer.id)
+            .outerjoin(Product, ProductSale.product_id == Product.id)
+            .where(ProductSale.sale_date == target_date)
+        )
 
-        services = self.service_records.get_by_date(target_date)
-        sales = self.product_sales.get_by_date(target_date)
-        return services + sales
+        stmt = union_all(service_stmt, sale_stmt)
+        if limit is not None:
+            # 服务记录排在前面，与下方的排序约定一致
+            stmt = (
+                select(stmt.subquery())
+                .order_by(literal_column("type") != "service")
+                .limit(limit)
+            )
+
+        with self.get_session() as session:
+            rows = session.execute(stmt).all()
+
+        records: List[Dict[str, Any]] = []
+        for row in rows:
+            if row.type == "service":
+                records.append({
+                    "type": "service",
+                    "id": row.id,
+                    "customer_name": row.customer_name or "",
+                    "service_type": row.item_name or "",
+                    "amount": float(row.amount),
+                    "commission": (
+                        float(row.commission) if row.commission else None
+                    ),
+                    "commission_to": row.commission_to,
+                    "net_amount": (
+                        float(row.net_amount)
+                        if row.net_amount else float(row.amount)
+                    ),
+                    "confirmed": bool(row.confirmed),
+                })
+            else:
+                records.append({
+                    "type": "product_sale",
+                    "id": row.id,
+                    "product_name": row.item_name or "",
+                    "customer_name": row.customer_name or "",
+                    "total_amount": float(row.total_amount),
+                    "quantity": row.quantity,
+                    "confirmed": bool(row.confirmed),
+                })
+        # 保持与旧实现一致的顺序：服务记录在前，销售记录在后
+        records.sort(key=lambda r: r["type"] != "service")
+        return records
 
     def get_staff_list(self, active_only: bool = True
                        ) -> List[Dict[str, Any]]:
@@ -9,7 +9,7 @@
 from typing import Dict, Any, List, Optional
 from sqlalchemy import (
     Column, Integer, String, Text, Boolean, Date, DateTime, 
-    DECIMAL, ForeignKey, JSON, UniqueConstraint
+    DECIMAL, ForeignKey, JSON, UniqueConstraint, Index
 )
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import relationship
@@ -268,6 +268,11 @@ class ServiceRecord(Base):
     extra_data: Dict[str, Any] = Column(JSON, default={})  # 扩展数据
     created_at: datetime = Column(DateTime, default=datetime.utcnow)
     
+    # 按日查询/按渠道统计提成走索引区间扫描，避免整表扫描
+    __table_args__ = (
+        Index("ix_svc_date_chan", "service_date", "referral_channel_id"),
+    )
+    
     # Relationships
     customer: Optional["Customer"] = relationship("Customer", back_populates="service_records")
     employee: Optional["Employee"] = relationship("Employee", foreign_keys=[employee_id], back_populates="service_records_as_employee")
@@ -356,6 +361,11 @@ class ProductSale(Base):
     confirmed: bool = Column(Boolean, default=False)
     created_at: datetime = Column(DateTime, default=datetime.utcnow)
     
+    # 按日汇总商品销售走索引区间扫描
+    __table_args__ = (
+        Index("ix_prod_sale_date", "sale_date"),
+    )
+    
     # Relationships
     product: Optional["Product"] = relationship("Product", back_populates="sales")
     customer: Optional["Customer"] = relationship("Customer", back_populates="product_sales")
@@ -5,6 +5,8 @@
 """
 from typing import Optional, List, Dict, Any, Union
 from datetime import date, datetime
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 from loguru import logger
 
@@ -25,7 +27,8 @@ class MessageRepository(BaseCRUD):
     def __init__(self, conn: DatabaseConnection) -> None:
         super().__init__(conn)
 
-    def save_raw_message(self, msg_data: Dict[str, Any]) -> int:
+    def save_raw_message(self, msg_data: Dict[str, Any],
+                         session: Optional[Session] = None) -> int:
         """保存原始消息（自动去重）。
 
         Args:
@@ -39,22 +42,14 @@ class MessageRepository(BaseCRUD):
                 - is_at_bot: 是否@机器人（可选）
                 - is_business: 是否为业务消息（可选）
                 - parse_status: 解析状态（可选，默认"pending"）
+            session: 外部会话（可选，用于事务组合）。
 
         Returns:
             消息记录ID（新建或已存在的）。
         """
-        with self._get_session() as session:
-            # 去重检查（如果提供了msg_id）
+        def _do(session):
             msg_id = msg_data.get("msg_id")
-            existing = None
-            if msg_id:
-                existing = session.query(RawMessage).filter(
-                    RawMessage.msg_id == msg_id
-                ).first()
-            if existing:
-                return existing.id
-
-            msg = RawMessage(
+            row = dict(
                 msg_id=msg_id,
                 sender_nickname=msg_data.get("sender_nickname"),
                 content=msg_data.get("content"),
@@ -65,14 +60,102 @@ class MessageRepository(BaseCRUD):
                 is_business=msg_data.get("is_business"),
                 parse_status=msg_data.get("parse_status", "pending")
             )
+
+            if msg_id:
+                # 常见路径一条语句搞定：INSERT ... ON CONFLICT DO
+                # NOTHING RETURNING id；撞上 msg_id 唯一索引（重复消息）
+                # 时 RETURNING 为空，再退回一条 id 查询
+                stmt = sqlite_insert(RawMessage).values(
+                    **row
+                ).on_conflict_do_nothing(
+                    index_elements=["msg_id"]
+                ).returning(RawMessage.id)
+                new_id = session.execute(stmt).scalar()
+                if new_id is None:
+                    new_id = session.execute(
+                        select(RawMessage.id).where(
+                            RawMessage.msg_id == msg_id
+                        )
+                    ).scalar_one()
+                return new_id
+
+            msg = RawMessage(**row)
             session.add(msg)
-            session.commit()
-            session.refresh(msg)
+            session.flush()
             return msg.id
 
+        if session:
+            return _do(session)
+
+        with self._get_session() as sess:
+            msg_record_id = _do(sess)
+            sess.commit()
+            return msg_record_id
+
+    def save_raw_messages_bulk(
+        self, msgs: List[Dict[str, Any]]
+    ) -> List[int]:
+        """批量保存原始消息（自动去重）。
+
+        整批只需一条 IN 去重查询加一次 executemany INSERT，
+        替代逐条 save_raw_message 的多次往返，适合消息回填等批量场景。
+
+        Args:
+            msgs: 消息数据字典列表，每项的键同 save_raw_message。
+
+        Returns:
+            消息记录ID列表，顺序与 msgs 一致（重复消息返回已存在的ID）。
+        """
+        with self._get_session() as session:
+            msg_ids = [m["msg_id"] for m in msgs if m.get("msg_id")]
+            existing: Dict[str, int] = {}
+            if msg_ids:
+                existing = {
+                    mid: rid
+                    for rid, mid in session.query(
+                        RawMessage.id, RawMessage.msg_id
+                    ).filter(RawMessage.msg_id.in_(msg_ids)).all()
+                }
+
+            new_rows = [
+                {
+                    "msg_id": m.get("msg_id"),
+                    "sender_nickname": m.get("sender_nickname"),
+                    "content": m.get("content"),
+                    "msg_type": m.get("msg_type", "text"),
+                    "group_id": m.get("group_id"),
+                    "timestamp": m.get("timestamp"),
+                    "is_at_bot": m.get("is_at_bot", False),
+                    "is_business": m.get("is_business"),
+                    "parse_status": m.get("parse_status", "pending"),
+                }
+                for m in msgs
+                if not (m.get("msg_id") and m["msg_id"] in existing)
+            ]
+            new_ids: List[int] = []
+            if new_rows:
+                new_ids = list(session.execute(
+                    insert(RawMessage).returning(
+                        RawMessage.id, sort_by_parameter_order=True
+                    ),
+                    new_rows,
+                ).scalars())
+            session.commit()
+
+            result: List[int] = []
+            fresh = iter(new_ids)
+            for m in msgs:
+                mid = m.get("msg_id")
+                if mid and mid in existing:
+                    result.append(existing[mid])
+                else:
+                    result.append(next(fresh))
+            return result
+
     def update_parse_status(self, msg_id: int, status: str,
                             result: Optional[Dict[str, Any]] = None,
-                            error: Optional[str] = None) -> None:
+                            error: Optional[str] = None,
+                            session: Optional[Session] = None) -> None:
         """更新消息解析状态。
 
         Args:
@@ -80,20 +163,28 @@ class MessageRepository(BaseCRUD):
             status: 新的解析状态（pending/parsed/failed/ignored）。
             result: 解析结果字典（可选）。
             error: 解析错误信息（可选）。
+            session: 外部会话（可选，用于事务组合）。
         """
-        with self._get_session() as session:
-            msg = session.query(RawMessage).filter(
-                RawMessage.id == msg_id
-            ).first()
+        def _do(sess):
+            msg = sess.get(RawMessage, msg_id)
             if msg:
                 msg.parse_status = status
                 if result is not None:
                     msg.parse_result = result
                 if error is not None:
                     msg.parse_error = error
-                session.commit()
+            return msg
+
+        if session:
+            _do(session)
+            return
+
+        with self._get_session() as sess:
+            if _do(sess):
+                sess.commit()
 
-    def save_correction(self, correction_data: Dict[str, Any]) -> int:
+    def save_correction(self, correction_data: Dict[str, Any],
+                        session: Optional[Session] = None) -> int:
         """保存修正记录。
 
         Args:
@@ -105,11 +196,12 @@ class MessageRepository(BaseCRUD):
                 - new_value: 新值（JSON）
                 - reason: 修正原因
                 - raw_message_id: 关联的原始消息ID
+            session: 外部会话（可选，用于事务组合）。
 
         Returns:
             修正记录ID。
         """
-        with self._get_session() as session:
+        def _do(sess):
             correction = Correction(
                 original_record_type=correction_data.get(
                     "original_record_type"
@@ -123,11 +215,58 @@ class MessageRepository(BaseCRUD):
                 reason=correction_data.get("reason"),
                 raw_message_id=correction_data.get("raw_message_id")
             )
-            session.add(correction)
-            session.commit()
-            session.refresh(correction)
+            sess.add(correction)
+            sess.flush()
             return correction.id
 
+        if session:
+            return _do(session)
+
+        with self._get_session() as sess:
+            correction_id = _do(sess)
+            sess.commit()
+            return correction_id
+
+    def save_corrections_bulk(
+        self, corrections: List[Dict[str, Any]]
+    ) -> List[int]:
+        """批量保存修正记录。
+
+        整批只需一次 executemany INSERT 加一次提交，替代逐条
+        save_correction 的多次往返，适合批量回填审计日志的场景。
+        所有行在同一事务中原子提交。
+
+        Args:
+            corrections: 修正数据字典列表，每项的键同 save_correction。
+
+        Returns:
+            修正记录ID列表，顺序与 corrections 一致。
+        """
+        rows = [
+            {
+                "original_record_type": c.get("original_record_type"),
+                "original_record_id": c.get("original_record_id"),
+                "correction_type": c.get("correction_type"),
+                "old_value": c.get("old_value"),
+                "new_value": c.get("new_value"),
+                "reason": c.get("reason"),
+                "raw_message_id": c.get("raw_message_id"),
+            }
+            for c in corrections
+        ]
+        if not rows:
+            return []
+
+        with self._get_session() as session:
+            ids = list(session.execute(
+                insert(Correction).returning(
+                    Correction.id, sort_by_parameter_order=True
+                ),
+                rows,
+            ).scalars())
+            session.commit()
+            return ids
+
 
 class SummaryRepository(BaseCRUD):
     """每日汇总 仓库。
@@ -137,6 +276,9 @@ class SummaryRepository(BaseCRUD):
 
     def __init__(self, conn: DatabaseConnection) -> None:
         super().__init__(conn)
+        # 写穿缓存：日期 → 汇总记录ID，save 时填充，
+        # 让紧随其后的 get_by_date 走主键快路径而非条件查询。
+        self._by_date: Dict[date, int] = {}
 
     def save(self, summary_date: date,
              summary_data: Dict[str, Any]) -> int:
@@ -161,26 +303,25 @@ class SummaryRepository(BaseCRUD):
         Returns:
             汇总记录ID。
         """
+        # 原生 upsert：一条 INSERT ... ON CONFLICT DO UPDATE 代替
+        # SELECT + INSERT/UPDATE 的两次往返，RETURNING 直接拿回ID。
+        values = {
+            key: value for key, value in summary_data.items()
+            if hasattr(DailySummary, key)
+        }
+        stmt = sqlite_insert(DailySummary).values(
+            summary_date=summary_date, **values
+        ).on_conflict_do_update(
+            index_elements=["summary_date"],
+            set_=values or {"summary_date": summary_date},
+        ).returning(DailySummary.id)
+
         with self._get_session() as session:
-            existing = session.query(DailySummary).filter(
-                DailySummary.summary_date == summary_date
-            ).first()
+            summary_id = session.execute(stmt).scalar_one()
+            session.commit()
 
-            if existing:
-                for key, value in summary_data.items():
-                    if hasattr(existing, key):
-                        setattr(existing, key, value)
-                session.commit()
-                session.refresh(existing)
-                return existing.id
-            else:
-                summary = DailySummary(
-                    summary_date=summary_date, **summary_data
-                )
-                session.add(summary)
-                session.commit()
-                session.refresh(summary)
-                return summary.id
+        self._by_date[summary_date] = summary_id
+        return summary_id
 
     def get_by_date(self, summary_date: date,
                     session: Optional[Session] = None
@@ -194,9 +335,21 @@ class SummaryRepository(BaseCRUD):
             DailySummary 对象，不存在则返回 None。
         """
         def _query(sess):
-            return sess.query(DailySummary).filter(
+            cached_id = self._by_date.get(summary_date)
+            if cached_id is not None:
+                summary = sess.get(DailySummary, cached_id)
+                if (summary is not None
+                        and summary.summary_date == summary_date):
+                    return summary
+                # 记录已被删除或 ID 被复用到其他日期（删除后 rowid
+                # 回收），丢弃过期缓存并回退到条件查询
+                self._by_date.pop(summary_date, None)
+            summary = sess.query(DailySummary).filter(
                 DailySummary.summary_date == summary_date
             ).first()
+            if summary is not None:
+                self._by_date[summary_date] = summary.id
+            return summary
 
         if session:
             return _query(session)
@@ -204,6 +357,31 @@ class SummaryRepository(BaseCRUD):
         with self._get_session() as sess:
             return _query(sess)
 
+    def delete_by_id(self, model_class, record_id: int,
+                     session: Optional[Session] = None) -> bool:
+        """根据ID删除记录，并同步失效日期缓存。
+
+        删除 DailySummary 后其 rowid 可能被后续插入复用，
+        若不摘除对应的 ``_by_date`` 条目，get_by_date 的快路径
+        可能命中复用了该 ID 的其他日期的记录。
+
+        Args:
+            model_class: ORM 模型类。
+            record_id: 记录ID。
+            session: 外部会话（可选）。
+
+        Returns:
+            是否成功删除。
+        """
+        deleted = super().delete_by_id(
+            model_class, record_id, session=session
+        )
+        if deleted and model_class is DailySummary:
+            for cached_date, cached_id in list(self._by_date.items()):
+                if cached_id == record_id:
+                    self._by_date.pop(cached_date, None)
+        return deleted
+
 
 class PluginRepository(BaseCRUD):
     """插件数据 仓库。
@@ -237,32 +415,69 @@ class PluginRepository(BaseCRUD):
         Returns:
             插件数据记录ID。
         """
+        # 原生 upsert：一条语句完成"存在则更新，否则插入"，
+        # 冲突目标即 uq_plugin_data 唯一约束。
+        stmt = sqlite_insert(PluginData).values(
+            plugin_name=plugin_name,
+            entity_type=entity_type,
+            entity_id=entity_id,
+            data_key=data_key,
+            data_value=data_value
+        ).on_conflict_do_update(
+            index_elements=[
+                "plugin_name", "entity_type", "entity_id", "data_key"
+            ],
+            set_={
+                "data_value": data_value,
+                "updated_at": datetime.utcnow(),
+            },
+        ).returning(PluginData.id)
+
         with self._get_session() as session:
-            existing = session.query(PluginData).filter(
-                PluginData.plugin_name == plugin_name,
-                PluginData.entity_type == entity_type,
-                PluginData.entity_id == entity_id,
-                PluginData.data_key == data_key
-            ).first()
+            plugin_data_id = session.execute(stmt).scalar_one()
+            session.commit()
+            return plugin_data_id
 
-            if existing:
-                existing.data_value = data_value
-                existing.updated_at = datetime.utcnow()
-                session.commit()
-                session.refresh(existing)
-                return existing.id
-            else:
-                plugin_data = PluginData(
-                    plugin_name=plugin_name,
-                    entity_type=entity_type,
-                    entity_id=entity_id,
-                    data_key=data_key,
-                    data_value=data_value
-                )
-                session.add(plugin_data)
-                session.commit()
-                session.refresh(plugin_data)
-                return plugin_data.id
+    def save_many(self, plugin_name: str, entity_type: str,
+                  entity_id: int, items: Dict[str, Any]) -> None:
+        """批量保存或更新同一实体的多个插件数据键（幂等）。
+
+        整批走一次 executemany upsert，替代逐键 save 的多次往返，
+        适合一次写入多项扩展数据（如整组体测指标）。
+
+        Args:
+            plugin_name: 插件标识。
+            entity_type: 实体类型。
+            entity_id: 实体ID。
+            items: 数据键 → 数据值 的字典。
+        """
+        if not items:
+            return
+
+        stmt = sqlite_insert(PluginData)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                "plugin_name", "entity_type", "entity_id", "data_key"
+            ],
+            set_={
+                "data_value": stmt.excluded.data_value,
+                "updated_at": datetime.utcnow(),
+            },
+        )
+        rows = [
+            {
+                "plugin_name": plugin_name,
+                "entity_type": entity_type,
+                "entity_id": entity_id,
+                "data_key": key,
+                "data_value": value,
+            }
+            for key, value in items.items()
+        ]
+
+        with self._get_session() as session:
+            session.execute(stmt, rows)
+            session.commit()
 
     def get(self, plugin_name: str, entity_type: str,
             entity_id: int,
@@ -279,22 +494,26 @@ class PluginRepository(BaseCRUD):
         Returns:
             单个值或键值对字典。
         """
-        with self._get_session() as session:
-            query = session.query(PluginData).filter(
-                PluginData.plugin_name == plugin_name,
-                PluginData.entity_type == entity_type,
-                PluginData.entity_id == entity_id
+        # 不做 ORM 对象化：单键路径只取 data_value 一个标量，
+        # 全键路径取 (data_key, data_value) 两列直接构建字典；
+        # 条件命中 uq_plugin_data 唯一索引前缀，零行路径一次探测即返回。
+        where = (
+            PluginData.plugin_name == plugin_name,
+            PluginData.entity_type == entity_type,
+            PluginData.entity_id == entity_id,
+        )
+        if data_key:
+            stmt = select(PluginData.data_value).where(
+                *where, PluginData.data_key == data_key
             )
-            if data_key:
-                query = query.filter(PluginData.data_key == data_key)
+            with self._get_session() as session:
+                return session.execute(stmt).scalar_one_or_none()
 
-            results = query.all()
-            if data_key:
-                return results[0].data_value if results else None
-            else:
-                return {
-                    item.data_key: item.data_value for item in results
-                }
+        stmt = select(PluginData.data_key, PluginData.data_value).where(
+            *where
+        )
+        with self._get_session() as session:
+            return dict(session.execute(stmt).all())
 
     def delete(self, plugin_name: str, entity_type: str,
                entity_id: int,
@@ -97,7 +97,7 @@ def record_service_income(
     db = _get_db()
     try:
         service_date = (
-            datetime.strptime(date_str, "%Y-%m-%d").date()
+            date.fromisoformat(date_str)
             if date_str
             else date.today()
         )
@@ -179,7 +179,7 @@ def open_membership_card(
     db = _get_db()
     try:
         opened_date = (
-            datetime.strptime(date_str, "%Y-%m-%d").date()
+            date.fromisoformat(date_str)
             if date_str
             else date.today()
         )
@@ -250,7 +250,7 @@ def record_product_sale(
     db = _get_db()
     try:
         sale_date = (
-            datetime.strptime(date_str, "%Y-%m-%d").date()
+            date.fromisoformat(date_str)
             if date_str
             else date.today()
         )
@@ -300,7 +300,7 @@ def query_daily_income(date_str: Optional[str] = None) -> dict:
     db = _get_db()
     try:
         query_date = (
-            datetime.strptime(date_str, "%Y-%m-%d").date()
+            date.fromisoformat(date_str)
             if date_str
             else date.today()
         )
@@ -443,7 +443,7 @@ def query_therapist_commission(
             if therapist_name:
                 query = query.filter(ReferralChannel.name == therapist_name)
             if date_str:
-                qd = datetime.strptime(date_str, "%Y-%m-%d").date()
+                qd = date.fromisoformat(date_str)
                 query = query.filter(ServiceRecord.service_date == qd)
 
             query = query.group_by(ReferralChannel.name)
@@ -28,11 +28,20 @@ class MessageType(Enum):
     FILE = "file"       # 文件消息（content 为文件路径或 URL）
 
 
-@dataclass
+# 模块级预编译的类型 ↔ 字符串映射：发送/解析热路径上每条消息都要
+# 做这个转换，查一次 dict 比每次取 .value / 构造 Enum 便宜。
+TYPE_TO_STR: Dict[MessageType, str] = {m: m.value for m in MessageType}
+STR_TO_TYPE: Dict[str, MessageType] = {v: m for m, v in TYPE_TO_STR.items()}
+
+
+@dataclass(slots=True)
 class Message:
     """统一入站消息格式
 
     所有通道收到的消息都转换为此格式后交给 MessageHandler 处理。
+    slots=True 省去每实例的 __dict__（高吞吐通道下每条消息都要
+    构造一个 Message，内存与属性访问都更省）；channel_name 由
+    Channel.handle 填充，因此保持可变。
 
     Attributes:
         type: 消息类型
@@ -54,11 +63,12 @@ class Message:
     extra: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Reply:
     """统一出站回复格式
 
     MessageHandler 处理完消息后返回此格式，由 Channel 转换为通道特定格式发送。
+    不可变且无 __dict__：构造后只读，可安全用作字典键（如去重逻辑）。
 
     Attributes:
         type: 回复类型
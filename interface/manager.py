@@ -28,6 +28,9 @@ class ChannelManager:
         """
         self.channels: Dict[str, Channel] = {}
         self._message_handler = message_handler
+        # 运行中通道名称集合：随启动/停止维护，
+        # get_running_channels 无需逐个探测通道状态
+        self._running: set = set()
 
     def register(self, channel: Channel):
         """注册通道
@@ -42,6 +45,10 @@ class ChannelManager:
         if name in self.channels:
             logger.warning(f"通道 {name} 已注册，将被替换")
         self.channels[name] = channel
+        if channel.is_running:
+            self._running.add(name)
+        else:
+            self._running.discard(name)
 
         # 自动设置全局 handler
         if self._message_handler and not channel._message_handler:
@@ -63,6 +70,7 @@ class ChannelManager:
                 logger.info(f"通道 {name} 正在运行，先停止...")
                 asyncio.ensure_future(channel.shutdown())
             del self.channels[name]
+            self._running.discard(name)
             logger.info(f"通道已注销: {name}")
 
     def get_channel(self, name: str) -> Optional[Channel]:
@@ -77,23 +85,35 @@ class ChannelManager:
         return self.channels.get(name)
 
     async def start_all(self):
-        """启动所有已注册的通道"""
-        for name, channel in self.channels.items():
-            try:
-                await channel.startup()
+        """启动所有已注册的通道（并发启动，互不阻塞）"""
+        names = list(self.channels.keys())
+        results = await asyncio.gather(
+            *(self.channels[name].startup() for name in names),
+            return_exceptions=True,
+        )
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                logger.error(f"通道启动失败 {name}: {result}")
+            else:
+                self._running.add(name)
                 logger.info(f"通道已启动: {name}")
-            except Exception as e:
-                logger.error(f"通道启动失败 {name}: {e}")
 
     async def stop_all(self):
-        """停止所有已注册的通道"""
-        for name, channel in self.channels.items():
-            try:
-                if channel.is_running:
-                    await channel.shutdown()
-                    logger.info(f"通道已停止: {name}")
-            except Exception as e:
-                logger.error(f"通道停止失败 {name}: {e}")
+        """停止所有已注册的通道（并发停止，互不阻塞）"""
+        names = [
+            name for name, channel in self.channels.items()
+            if channel.is_running
+        ]
+        results = await asyncio.gather(
+            *(self.channels[name].shutdown() for name in names),
+            return_exceptions=True,
+        )
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                logger.error(f"通道停止失败 {name}: {result}")
+            else:
+                self._running.discard(name)
+                logger.info(f"通道已停止: {name}")
 
     async def start(self, name: str):
         """启动指定通道
@@ -104,6 +124,7 @@ class ChannelManager:
         channel = self.get_channel(name)
         if channel:
             await channel.startup()
+            self._running.add(name)
         else:
             logger.warning(f"通道不存在: {name}")
 
@@ -116,6 +137,7 @@ class ChannelManager:
         channel = self.get_channel(name)
         if channel:
             await channel.shutdown()
+            self._running.discard(name)
         else:
             logger.warning(f"通道不存在: {name}")
 
@@ -124,5 +146,5 @@ class ChannelManager:
         return list(self.channels.keys())
 
     def get_running_channels(self) -> List[str]:
-        """获取所有正在运行的通道名称"""
-        return [name for name, ch in self.channels.items() if ch.is_running]
+        """获取所有正在运行的通道名称（O(1) 集合快照）"""
+        return list(self._running)
@@ -16,7 +16,9 @@ from typing import Optional
 
 from loguru import logger
 
-from interface.base import Channel, Message, MessageHandler, MessageType, Reply
+from interface.base import (
+    Channel, Message, MessageHandler, MessageType, Reply, TYPE_TO_STR,
+)
 
 
 class TerminalChannel(Channel):
@@ -68,7 +70,7 @@ class TerminalChannel(Channel):
         if reply.type == MessageType.TEXT:
             print(f"\n🤖 {self.bot_name}: {reply.content}\n")
         else:
-            print(f"\n🤖 {self.bot_name}: [{reply.type.value}] {reply.content}\n")
+            print(f"\n🤖 {self.bot_name}: [{TYPE_TO_STR[reply.type]}] {reply.content}\n")
 
     async def run_loop(self):
         """运行交互循环
@@ -25,7 +25,9 @@ from typing import Any, Dict, List, Optional
 
 from loguru import logger
 
-from interface.base import Channel, Message, MessageHandler, MessageType, Reply
+from interface.base import (
+    Channel, Message, MessageHandler, MessageType, Reply, TYPE_TO_STR,
+)
 
 
 def _json_serial(obj):
@@ -166,7 +168,7 @@ class WebChannel(Channel):
             try:
                 reply = await self.handle(message)
                 if reply:
-                    return {"reply": reply.content, "type": reply.type.value}
+                    return {"reply": reply.content, "type": TYPE_TO_STR[reply.type]}
                 else:
                     return {"reply": "抱歉，我暂时无法处理你的请求。", "type": "text"}
             except Exception as e:
@@ -274,11 +276,11 @@ class WebChannel(Channel):
                 )
                 if start_date:
                     query = query.filter(
-                        ServiceRecord.service_date >= datetime.strptime(start_date, "%Y-%m-%d").date()
+                        ServiceRecord.service_date >= date.fromisoformat(start_date)
                     )
                 if end_date:
                     query = query.filter(
-                        ServiceRecord.service_date <= datetime.strptime(end_date, "%Y-%m-%d").date()
+                        ServiceRecord.service_date <= date.fromisoformat(end_date)
                     )
                 records = query.limit(500).all()
                 data = []
@@ -320,11 +322,11 @@ class WebChannel(Channel):
                 )
                 if start_date:
                     query = query.filter(
-                        ProductSale.sale_date >= datetime.strptime(start_date, "%Y-%m-%d").date()
+                        ProductSale.sale_date >= date.fromisoformat(start_date)
                     )
                 if end_date:
                     query = query.filter(
-                        ProductSale.sale_date <= datetime.strptime(end_date, "%Y-%m-%d").date()
+                        ProductSale.sale_date <= date.fromisoformat(end_date)
                     )
                 records = query.limit(500).all()
                 data = []
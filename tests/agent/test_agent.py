@@ -192,6 +192,73 @@ class TestAgentChat:
         assert call_kwargs["temperature"] == 0.5
         assert call_kwargs["max_tokens"] == 100
 
+    @pytest.mark.asyncio
+    async def test_run_batch_async(self, mock_llm_provider):
+        """批量接口应并发处理且不污染原 Agent 的历史。"""
+        agent = Agent(mock_llm_provider, system_prompt="你是助手")
+        results = await agent.run_batch_async(["消息1", "消息2", "消息3"])
+
+        assert len(results) == 3
+        assert all(r["content"] == "这是一个测试回复" for r in results)
+        assert mock_llm_provider.chat.call_count == 3
+        # 批量调用走独立克隆，原 Agent 历史只剩系统提示词
+        assert len(agent.conversation_history) == 1
+        assert agent.conversation_history[0].role == "system"
+
+    @pytest.mark.asyncio
+    async def test_history_condensation(self, mock_llm_provider):
+        """超出 token 预算的旧轮次应被压缩成工具调用摘要。"""
+        agent = Agent(
+            mock_llm_provider,
+            system_prompt="助手",
+            history_token_limit=50,
+        )
+        # 预填一段超出预算的旧对话（带工具调用）
+        agent.conversation_history.extend([
+            LLMMessage(role="user", content="旧消息" * 60),
+            LLMMessage(
+                role="assistant",
+                content="",
+                tool_calls=[FunctionCall(
+                    name="record_service_income",
+                    arguments={"customer_name": "张伟", "amount": 300},
+                    id="call_old",
+                )],
+            ),
+            LLMMessage(
+                role="tool",
+                content='{"success": true}',
+                name="record_service_income",
+                tool_call_id="call_old",
+            ),
+            LLMMessage(role="assistant", content="已记录"),
+        ])
+
+        await agent.chat("新消息")
+
+        sent = mock_llm_provider.chat.call_args.kwargs["messages"]
+        contents = [m.content or "" for m in sent]
+        # 旧原文被丢弃，换成一行结构化摘要；system 前缀保留
+        assert sent[0].role == "system"
+        assert not any("旧消息" in c for c in contents)
+        assert any(
+            "prior tool calls" in c and "record_service_income" in c
+            for c in contents
+        )
+        # 不能留下孤立的 tool 消息
+        assert all(m.role != "tool" for m in sent)
+
+    @pytest.mark.asyncio
+    async def test_condensation_disabled_under_budget(
+        self, mock_llm_provider
+    ):
+        """预算内的历史不应被触碰。"""
+        agent = Agent(mock_llm_provider, system_prompt="助手")
+        await agent.chat("你好")
+        await agent.chat("再见")
+        # system + 2×(user+assistant)
+        assert len(agent.conversation_history) == 5
+
 
 class TestAgentParseMessage:
     """Agent.parse_message() 测试。"""
@@ -132,7 +132,7 @@ class TestClaudeProvider:
         # 不设 usage 属性
         if hasattr(mock_resp, "usage"):
             del mock_resp.usage
-        p.client.messages.create = Mock(return_value=mock_resp)
+        p.client.messages.create = AsyncMock(return_value=mock_resp)
 
         resp = await p.chat([LLMMessage(role="user", content="你好")])
         assert resp.content == "回复"
@@ -145,7 +145,7 @@ class TestClaudeProvider:
         mock_resp = Mock(content=[text_block], stop_reason="end_turn")
         if hasattr(mock_resp, "usage"):
             del mock_resp.usage
-        p.client.messages.create = Mock(return_value=mock_resp)
+        p.client.messages.create = AsyncMock(return_value=mock_resp)
 
         await p.chat([
             LLMMessage(role="system", content="你是助手"),
@@ -153,7 +153,12 @@ class TestClaudeProvider:
         ])
 
         kwargs = p.client.messages.create.call_args.kwargs
-        assert kwargs["system"] == "你是助手"
+        # System is sent as a cacheable text block (prompt caching)
+        assert kwargs["system"] == [{
+            "type": "text",
+            "text": "你是助手",
+            "cache_control": {"type": "ephemeral"},
+        }]
         assert all(
             m["role"] != "system" for m in kwargs["messages"]
         )
@@ -169,7 +174,7 @@ class TestClaudeProvider:
         mock_resp = Mock(content=[tool_block], stop_reason="tool_use")
         if hasattr(mock_resp, "usage"):
             del mock_resp.usage
-        p.client.messages.create = Mock(return_value=mock_resp)
+        p.client.messages.create = AsyncMock(return_value=mock_resp)
 
         resp = await p.chat(
             [LLMMessage(role="user", content="call")],
@@ -194,7 +199,7 @@ class TestClaudeProvider:
         )
         if hasattr(mock_resp, "usage"):
             del mock_resp.usage
-        p.client.messages.create = Mock(return_value=mock_resp)
+        p.client.messages.create = AsyncMock(return_value=mock_resp)
 
         resp = await p.chat([LLMMessage(role="user", content="思考")])
         assert resp.content == "结果"
@@ -217,7 +222,7 @@ class TestClaudeProvider:
         )
         if hasattr(mock_resp, "usage"):
             del mock_resp.usage
-        p.client.messages.create = Mock(return_value=mock_resp)
+        p.client.messages.create = AsyncMock(return_value=mock_resp)
 
         resp = await p.chat([LLMMessage(role="user", content="test")])
         assert resp.content == "需要调用函数"
@@ -234,7 +239,7 @@ class TestClaudeProvider:
         )
         if hasattr(mock_resp, "usage"):
             del mock_resp.usage
-        p.client.messages.create = Mock(return_value=mock_resp)
+        p.client.messages.create = AsyncMock(return_value=mock_resp)
 
         original_blocks = [
             {"type": "text", "text": "thinking..."},
@@ -91,6 +91,25 @@ class TestFunctionRegistry:
             assert "description" in f
             assert "parameters" in f
 
+    def test_list_functions_deterministic_order(self, function_registry):
+        """Tool payload must not depend on registration order (prompt cache)."""
+        import json
+
+        function_registry.register("zeta", "d", sync_test_function)
+        function_registry.register("alpha", "d", sync_test_function)
+        function_registry.register("mike", "d", sync_test_function)
+
+        other = FunctionRegistry()
+        other.register("mike", "d", sync_test_function)
+        other.register("zeta", "d", sync_test_function)
+        other.register("alpha", "d", sync_test_function)
+
+        fns = function_registry.list_functions()
+        assert [f["name"] for f in fns] == ["alpha", "mike", "zeta"]
+        # Byte-identical payload regardless of registration order
+        assert json.dumps(fns, sort_keys=True) == \
+            json.dumps(other.list_functions(), sort_keys=True)
+
     def test_infer_complex_types(self, function_registry):
         def complex_fn(
             s: str, i: int, f: float, b: bool,
@@ -3,12 +3,17 @@
 Provides reusable fixtures for all database test modules, including
 a fresh in-memory or temp-file SQLite DatabaseManager for each test.
 """
+import contextlib
+import json
 import os
 import shutil
 import tempfile
 from datetime import datetime, date
 
 import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, raiseload, sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from database import DatabaseManager
 from database.connection import DatabaseConnection
@@ -30,20 +35,238 @@ from database.system_repos import (
 )
 
 
+def _apply_test_pragmas(dbapi_conn, _record):
+    """Speed up write-heavy tests: relax SQLite durability settings.
+
+    Safe for tests only — a crash merely loses test data.
+    """
+    cursor = dbapi_conn.cursor()
+    # WAL (not journal_mode=MEMORY) so the multi-threaded tests keep
+    # concurrent readers; synchronous=OFF drops the fsync per commit.
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-65536")
+    cursor.close()
+
+
+def _apply_memory_pragmas(dbapi_conn, _record):
+    """Pragmas for the in-memory test database: no durability needed."""
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+@pytest.fixture(scope="session")
+def _shared_manager():
+    """Session-scoped DatabaseManager with the schema created exactly once.
+
+    Runs entirely on in-memory SQLite — commits never touch disk.
+    Individual tests get isolation from the ``temp_db`` fixture below;
+    building engine + schema per test dominated this package's runtime.
+    """
+    manager = DatabaseManager(database_url="sqlite:///:memory:")
+    event.listen(manager.engine, "connect", _apply_memory_pragmas)
+
+    # pysqlite's implicit transaction handling breaks SAVEPOINT; take
+    # over transaction control so the rollback-per-test recipe works.
+    @event.listens_for(manager.engine, "connect")
+    def _disable_implicit_begin(dbapi_conn, _record):
+        dbapi_conn.isolation_level = None
+
+    @event.listens_for(manager.engine, "begin")
+    def _emit_begin(conn):
+        # Direct engine use during a test (e.g. create_tables) shares
+        # the single in-memory connection, which may already be inside
+        # the fixture's outer transaction.
+        if not conn.connection.dbapi_connection.in_transaction:
+            conn.exec_driver_sql("BEGIN")
+
+    manager.create_tables()
+    try:
+        yield manager
+    finally:
+        manager.close()
+
+
+@pytest.fixture
+def temp_db(_shared_manager):
+    """Yield the shared DatabaseManager inside a rolled-back transaction.
+
+    Rebinds the manager's session factory to one connection whose outer
+    transaction is rolled back at teardown; repository commits become
+    SAVEPOINT releases, so every test still observes its own writes but
+    leaves the database pristine.
+    """
+    manager = _shared_manager
+    connection = manager.engine.connect()
+    transaction = connection.begin()
+    original_factory = manager.conn.SessionLocal
+    manager.conn.SessionLocal = sessionmaker(
+        bind=connection,
+        autocommit=False,
+        autoflush=False,
+        join_transaction_mode="create_savepoint",
+        # Keep attributes readable after commit without a re-SELECT per
+        # object; test verify blocks only read what they just wrote.
+        expire_on_commit=False,
+    )
+
+    try:
+        yield manager
+    finally:
+        manager.conn.SessionLocal = original_factory
+        if transaction.is_active:
+            transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture(scope="session")
+def _template_db(tmp_path_factory):
+    """Session-scoped template SQLite file with the schema pre-built.
+
+    Fresh file databases are cloned from this template with a file
+    copy instead of re-running DDL per test.
+    """
+    template = tmp_path_factory.mktemp("db-template") / "template.sqlite"
+    manager = DatabaseManager(database_url=f"sqlite:///{template}")
+    manager.create_tables()
+    manager.close()
+    return template
+
+
 @pytest.fixture
-def temp_db():
-    """Yield a fresh DatabaseManager bound to a temp SQLite database."""
+def isolated_db(_template_db):
+    """Yield a fresh DatabaseManager on its own temp SQLite database.
+
+    For tests that genuinely need engine-level isolation (e.g. hitting
+    the database from multiple threads), where the shared-connection
+    ``temp_db`` fixture would serialize or corrupt access. The database
+    file is copied from the session template, so no DDL runs here.
+    """
     temp_dir = tempfile.mkdtemp(prefix="db-tests-")
     db_path = os.path.join(temp_dir, "test.db")
+    shutil.copyfile(_template_db, db_path)
     manager = DatabaseManager(database_url=f"sqlite:///{db_path}")
-    manager.create_tables()
+    event.listen(manager.engine, "connect", _apply_test_pragmas)
 
     try:
         yield manager
     finally:
+        manager.close()
         shutil.rmtree(temp_dir, ignore_errors=True)
 
 
+@pytest.fixture(scope="session")
+def model_engine():
+    """Session-scoped engine with the schema created exactly once.
+
+    Used by the model tests, where per-test schema creation dominates
+    runtime; isolation is provided by the ``session`` fixture below.
+
+    The database lives entirely in memory: ``StaticPool`` keeps a single
+    shared connection alive so the schema survives across sessions, and
+    no commit ever touches disk.
+    """
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+        # Compact JSON for extra_data columns; reads hit the in-memory
+        # dict anyway thanks to expire_on_commit=False.
+        json_serializer=lambda v: json.dumps(
+            v, ensure_ascii=False, separators=(",", ":")
+        ),
+    )
+
+    # pysqlite's implicit transaction handling breaks SAVEPOINT; take
+    # over transaction control so the rollback-per-test recipe works.
+    @event.listens_for(engine, "connect")
+    def _disable_implicit_begin(dbapi_conn, _record):
+        dbapi_conn.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    Base.metadata.create_all(engine)
+
+    yield engine
+
+    engine.dispose()
+
+
+@pytest.fixture
+def session(model_engine):
+    """Function-scoped Session inside a rolled-back outer transaction.
+
+    The session joins a connection-level transaction via SAVEPOINTs
+    (``join_transaction_mode="create_savepoint"``), so tests may call
+    ``commit()`` freely while one ``rollback()`` at teardown restores a
+    pristine database without recreating the schema.
+    """
+    connection = model_engine.connect()
+    transaction = connection.begin()
+    sess = Session(
+        bind=connection,
+        join_transaction_mode="create_savepoint",
+        expire_on_commit=False,
+    )
+
+    # Fail fast on unintended lazy loads: objects fetched through this
+    # session raise unless the relationship was eagerly loaded (loads
+    # satisfiable from the identity map stay allowed via sql_only).
+    @event.listens_for(sess, "do_orm_execute")
+    def _forbid_lazy_loads(execute_state):
+        if (
+            execute_state.is_select
+            and not execute_state.is_column_load
+            and not execute_state.is_relationship_load
+        ):
+            execute_state.statement = execute_state.statement.options(
+                raiseload("*", sql_only=True)
+            )
+
+    try:
+        yield sess
+    finally:
+        sess.close()
+        if transaction.is_active:
+            transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture
+def sql_counter():
+    """Factory: context manager that records SQL statements on a session.
+
+    Used to assert query-count budgets so N+1 regressions fail loudly
+    instead of silently multiplying round trips::
+
+        with sql_counter(session) as statements:
+            ...  # code under budget
+        assert len(statements) <= 2
+    """
+    @contextlib.contextmanager
+    def count_queries(sess):
+        statements = []
+
+        def _record(_conn, _cursor, statement, *_args):
+            statements.append(statement)
+
+        engine = sess.get_bind()
+        event.listen(engine, "before_cursor_execute", _record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", _record)
+
+    return count_queries
+
+
 @pytest.fixture
 def db_conn(temp_db):
     """Yield a DatabaseConnection from the temp_db manager."""
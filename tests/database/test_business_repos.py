@@ -9,13 +9,18 @@ Tests for:
 from datetime import date, datetime
 
 import pytest
+from sqlalchemy import select
 
 from database.models import (
     ServiceRecord, ProductSale, Membership, Customer,
-    Employee, ServiceType, ReferralChannel,
+    Employee, ServiceType, ReferralChannel, Product,
 )
 from tests.database.conftest import make_raw_message
 
+# Shared date constants; built once at import instead of per call site.
+D_2024_01_28 = date(2024, 1, 28)
+DT_2024_01_28_10 = datetime(2024, 1, 28, 10, 0, 0)
+
 
 # ============================================================
 # ServiceRecordRepository Tests
@@ -100,10 +105,18 @@ class TestServiceRecordRepository:
         )
 
         with temp_db.get_session() as session:
-            record = session.query(ServiceRecord).filter_by(id=record_id).first()
-            assert float(record.commission_amount) == 20
-            assert record.commission_to == "李哥"
-            assert float(record.net_amount) == 178
+            # Core select returning plain tuples: no ORM hydration just
+            # to assert a few scalar columns.
+            row = session.execute(
+                select(
+                    ServiceRecord.commission_amount,
+                    ServiceRecord.commission_to,
+                    ServiceRecord.net_amount,
+                ).where(ServiceRecord.id == record_id)
+            ).one()
+            assert float(row.commission_amount) == 20
+            assert row.commission_to == "李哥"
+            assert float(row.net_amount) == 178
 
     def test_save_commission_to_creates_channel(self, temp_db):
         """commission_to should auto-create a referral channel."""
@@ -138,8 +151,12 @@ class TestServiceRecordRepository:
         )
 
         with temp_db.get_session() as session:
-            record = session.query(ServiceRecord).filter_by(id=record_id).first()
-            assert record.referral_channel_id == ch.id
+            channel_id = session.execute(
+                select(ServiceRecord.referral_channel_id).where(
+                    ServiceRecord.id == record_id
+                )
+            ).scalar_one()
+            assert channel_id == ch.id
 
     def test_save_with_membership_id(self, temp_db):
         msg_id1 = make_raw_message(temp_db, "sr-mem-setup")
@@ -161,8 +178,12 @@ class TestServiceRecordRepository:
         )
 
         with temp_db.get_session() as session:
-            record = session.query(ServiceRecord).filter_by(id=record_id).first()
-            assert record.membership_id == mid
+            membership_id = session.execute(
+                select(ServiceRecord.membership_id).where(
+                    ServiceRecord.id == record_id
+                )
+            ).scalar_one()
+            assert membership_id == mid
 
     def test_save_with_extra_data(self, temp_db):
         msg_id = make_raw_message(temp_db, "sr-extra")
@@ -177,8 +198,12 @@ class TestServiceRecordRepository:
             msg_id,
         )
         with temp_db.get_session() as session:
-            record = session.query(ServiceRecord).filter_by(id=record_id).first()
-            assert record.extra_data["duration"] == 60
+            extra_data = session.execute(
+                select(ServiceRecord.extra_data).where(
+                    ServiceRecord.id == record_id
+                )
+            ).scalar_one()
+            assert extra_data["duration"] == 60
 
     def test_save_with_date_object(self, temp_db):
         """date parameter can be a date object instead of string."""
@@ -187,37 +212,66 @@ class TestServiceRecordRepository:
             {
                 "customer_name": "Cust",
                 "service_or_product": "Therapy",
-                "date": date(2024, 1, 28),
+                "date": D_2024_01_28,
                 "amount": 100,
             },
             msg_id,
         )
         assert record_id > 0
 
-    def test_save_invalid_date_raises(self, temp_db):
-        msg_id = make_raw_message(temp_db, "sr-bad-date")
-        with pytest.raises(ValueError, match="Invalid date format"):
-            temp_db.service_records.save(
-                {
-                    "customer_name": "Cust",
-                    "service_or_product": "Therapy",
-                    "date": "2024/01/28",
-                    "amount": 100,
-                },
-                msg_id,
-            )
-
-    def test_save_missing_date_raises(self, temp_db):
-        msg_id = make_raw_message(temp_db, "sr-no-date")
-        with pytest.raises(ValueError, match="Service date is required"):
-            temp_db.service_records.save(
-                {
-                    "customer_name": "Cust",
-                    "service_or_product": "Therapy",
-                    "amount": 100,
-                },
-                msg_id,
-            )
+    # One parametrized test instead of a near-duplicate error-path test
+    # per repo: the shared fixture setup is paid once per case, and the
+    # table covers all three save() date validations.
+    @pytest.mark.parametrize(
+        "repo_name,data,match",
+        [
+            pytest.param(
+                "service_records",
+                {"customer_name": "Cust", "service_or_product": "Therapy",
+                 "date": "2024/01/28", "amount": 100},
+                "Invalid date format",
+                id="service-invalid-date",
+            ),
+            pytest.param(
+                "service_records",
+                {"customer_name": "Cust", "service_or_product": "Therapy",
+                 "amount": 100},
+                "Service date is required",
+                id="service-missing-date",
+            ),
+            pytest.param(
+                "product_sales",
+                {"service_or_product": "Product",
+                 "date": "28-01-2024", "amount": 50},
+                "Invalid date format",
+                id="sale-invalid-date",
+            ),
+            pytest.param(
+                "product_sales",
+                {"service_or_product": "Product", "amount": 50},
+                "Sale date is required",
+                id="sale-missing-date",
+            ),
+            pytest.param(
+                "memberships",
+                {"customer_name": "Mem", "date": "not-a-date",
+                 "amount": 500},
+                "Invalid date format",
+                id="membership-invalid-date",
+            ),
+            pytest.param(
+                "memberships",
+                {"customer_name": "Mem", "amount": 500},
+                "Membership opened_at date is required",
+                id="membership-missing-date",
+            ),
+        ],
+    )
+    def test_save_invalid_or_missing_date(self, temp_db, repo_name,
+                                          data, match):
+        msg_id = make_raw_message(temp_db, "bad-date")
+        with pytest.raises(ValueError, match=match):
+            getattr(temp_db, repo_name).save(data, msg_id)
 
     def test_save_zero_amount(self, temp_db):
         """Zero amount should be accepted (e.g. free trial)."""
@@ -259,8 +313,12 @@ class TestServiceRecordRepository:
             msg_id,
         )
         with temp_db.get_session() as session:
-            record = session.query(ServiceRecord).filter_by(id=record_id).first()
-            assert float(record.parse_confidence) == 0.5
+            confidence = session.execute(
+                select(ServiceRecord.parse_confidence).where(
+                    ServiceRecord.id == record_id
+                )
+            ).scalar_one()
+            assert float(confidence) == 0.5
 
     def test_get_by_date(self, temp_db):
         msg_id = make_raw_message(temp_db, "sr-bydate")
@@ -273,7 +331,7 @@ class TestServiceRecordRepository:
             },
             msg_id,
         )
-        records = temp_db.service_records.get_by_date(date(2024, 1, 28))
+        records = temp_db.service_records.get_by_date(D_2024_01_28)
         assert len(records) >= 1
         assert records[0]["type"] == "service"
         assert records[0]["customer_name"] == "Alice"
@@ -298,7 +356,7 @@ class TestServiceRecordRepository:
             },
             msg_id,
         )
-        records = temp_db.service_records.get_by_date(date(2024, 1, 28))
+        records = temp_db.service_records.get_by_date(D_2024_01_28)
         r = records[0]
         expected_keys = {
             "type", "id", "customer_name", "service_type",
@@ -322,7 +380,7 @@ class TestServiceRecordRepository:
         assert result is True
 
         with temp_db.get_session() as session:
-            record = session.query(ServiceRecord).filter_by(id=record_id).first()
+            record = session.get(ServiceRecord, record_id)
             assert record.confirmed is True
             assert record.confirmed_at is not None
 
@@ -360,7 +418,6 @@ class TestProductSaleRepository:
             },
             msg_id,
         )
-        from database.models import Product
         all_products = temp_db.products.get_all(Product)
         assert any(p.name == "NewAutoProduct" for p in all_products)
 
@@ -425,10 +482,16 @@ class TestProductSaleRepository:
         )
 
         with temp_db.get_session() as session:
-            sale = session.query(ProductSale).filter_by(id=sale_id).first()
-            assert sale.quantity == 2
-            assert sale.notes == "Two bottles"
-            assert sale.confirmed is True
+            row = session.execute(
+                select(
+                    ProductSale.quantity,
+                    ProductSale.notes,
+                    ProductSale.confirmed,
+                ).where(ProductSale.id == sale_id)
+            ).one()
+            assert row.quantity == 2
+            assert row.notes == "Two bottles"
+            assert row.confirmed is True
 
     def test_get_by_date(self, temp_db):
         msg_id = make_raw_message(temp_db, "ps-bydate")
@@ -441,7 +504,7 @@ class TestProductSaleRepository:
             },
             msg_id,
         )
-        records = temp_db.product_sales.get_by_date(date(2024, 1, 28))
+        records = temp_db.product_sales.get_by_date(D_2024_01_28)
         assert len(records) >= 1
         assert records[0]["type"] == "product_sale"
         assert records[0]["product_name"] == "Product"
@@ -494,8 +557,10 @@ class TestMembershipRepository:
             msg_id,
         )
         with temp_db.get_session() as session:
-            m = session.query(Membership).filter_by(id=mid).first()
-            assert m.card_type == "储值卡"
+            card_type = session.execute(
+                select(Membership.card_type).where(Membership.id == mid)
+            ).scalar_one()
+            assert card_type == "储值卡"
 
     def test_save_with_all_fields(self, temp_db):
         msg_id = make_raw_message(temp_db, "mem-all")
@@ -512,12 +577,20 @@ class TestMembershipRepository:
         )
 
         with temp_db.get_session() as session:
-            m = session.query(Membership).filter_by(id=mid).first()
-            assert m.card_type == "年卡"
-            assert float(m.total_amount) == 3000
-            assert float(m.balance) == 3000
-            assert m.remaining_sessions == 50
-            assert m.expires_at == date(2025, 1, 1)
+            row = session.execute(
+                select(
+                    Membership.card_type,
+                    Membership.total_amount,
+                    Membership.balance,
+                    Membership.remaining_sessions,
+                    Membership.expires_at,
+                ).where(Membership.id == mid)
+            ).one()
+            assert row.card_type == "年卡"
+            assert float(row.total_amount) == 3000
+            assert float(row.balance) == 3000
+            assert row.remaining_sessions == 50
+            assert row.expires_at == date(2025, 1, 1)
 
     def test_save_balance_equals_amount(self, temp_db):
         """Initial balance should equal the deposit amount."""
@@ -531,8 +604,12 @@ class TestMembershipRepository:
             msg_id,
         )
         with temp_db.get_session() as session:
-            m = session.query(Membership).filter_by(id=mid).first()
-            assert float(m.balance) == float(m.total_amount) == 2000
+            row = session.execute(
+                select(Membership.balance, Membership.total_amount).where(
+                    Membership.id == mid
+                )
+            ).one()
+            assert float(row.balance) == float(row.total_amount) == 2000
 
     def test_get_active_by_customer(self, temp_db):
         msg_id = make_raw_message(temp_db, "mem-active")
@@ -561,7 +638,7 @@ class TestMembershipRepository:
         )
         # Manually deactivate
         with temp_db.get_session() as session:
-            m = session.query(Membership).filter_by(id=mid).first()
+            m = session.get(Membership, mid)
             m.is_active = False
             session.commit()
 
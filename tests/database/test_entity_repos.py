@@ -110,7 +110,7 @@ class TestCustomerRepository:
         cust = temp_db.customers.get_or_create("PhoneUser")
         # Manually set phone
         with temp_db.get_session() as session:
-            row = session.query(Customer).filter_by(id=cust.id).first()
+            row = session.get(Customer, cust.id)
             row.phone = "13800001111"
             session.commit()
 
@@ -275,21 +275,31 @@ class TestChannelRepository:
             session.commit()
 
     def test_get_active_channels_all(self, temp_db):
-        temp_db.channels.get_or_create("Ch1", "platform")
-        temp_db.channels.get_or_create("Ch2", "external")
+        # One bulk call seeds both channels in two statements
+        temp_db.channels.ensure_many([("Ch1", "platform"), ("Ch2", "external")])
         channels = temp_db.channels.get_active_channels()
         assert len(channels) >= 2
 
     def test_get_active_channels_by_type(self, temp_db):
-        temp_db.channels.get_or_create("Platform1", "platform")
-        temp_db.channels.get_or_create("External1", "external")
+        temp_db.channels.ensure_many(
+            [("Platform1", "platform"), ("External1", "external")]
+        )
         platforms = temp_db.channels.get_active_channels("platform")
         assert all(c.channel_type == "platform" for c in platforms)
 
+    def test_ensure_many_returns_ids_in_order(self, temp_db):
+        existing = temp_db.channels.get_or_create("美团", "platform")
+        ids = temp_db.channels.ensure_many(
+            [("新渠道A", "external"), ("美团", "platform"), ("新渠道B", "external")]
+        )
+        assert len(ids) == 3
+        assert ids[1] == existing.id
+        assert len(set(ids)) == 3
+
     def test_get_active_channels_excludes_inactive(self, temp_db):
         ch = temp_db.channels.get_or_create("Inactive", "external")
         with temp_db.get_session() as session:
-            row = session.query(ReferralChannel).filter_by(id=ch.id).first()
+            row = session.get(ReferralChannel, ch.id)
             row.is_active = False
             session.commit()
 
@@ -299,7 +309,7 @@ class TestChannelRepository:
     def test_get_active_channels_include_all(self, temp_db):
         ch = temp_db.channels.get_or_create("AllCheck", "external")
         with temp_db.get_session() as session:
-            row = session.query(ReferralChannel).filter_by(id=ch.id).first()
+            row = session.get(ReferralChannel, ch.id)
             row.is_active = False
             session.commit()
 
@@ -6,11 +6,18 @@ Tests realistic workflows that span multiple repositories:
 - Multi-business-type: various record types in one day
 - Data flow: message → service record → daily records → summary
 """
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime
 
-from database.models import ServiceRecord, ReferralChannel
+import pytest
+
+from database.models import ServiceRecord, ReferralChannel, Membership
 from tests.database.conftest import make_raw_message
 
+# Shared date constants; built once at import instead of per call site.
+D_2024_01_28 = date(2024, 1, 28)
+DT_2024_01_28_10 = datetime(2024, 1, 28, 10, 0, 0)
+
 
 class TestHairSalonScenario:
     """Hair salon business scenario tests."""
@@ -28,7 +35,7 @@ class TestHairSalonScenario:
             "msg_id": "hair-daily-1",
             "sender_nickname": "assistant",
             "content": "Alice haircut 80",
-            "timestamp": datetime(2024, 1, 28, 10, 0, 0),
+            "timestamp": DT_2024_01_28_10,
         })
 
         # Save service record with referral channel
@@ -51,7 +58,7 @@ class TestHairSalonScenario:
         temp_db.update_parse_status(msg_id, "parsed", result={"records": 1})
 
         # Query records
-        records = temp_db.get_daily_records(date(2024, 1, 28))
+        records = temp_db.get_daily_records(D_2024_01_28)
         assert len(records) == 1
         assert records[0]["type"] == "service"
         assert records[0]["amount"] == 80.0
@@ -78,7 +85,7 @@ class TestHairSalonScenario:
 
         # Create daily summary
         sid = temp_db.save_daily_summary(
-            date(2024, 1, 28),
+            D_2024_01_28,
             {
                 "total_service_revenue": 280,
                 "service_count": 2,
@@ -201,9 +208,8 @@ class TestGymScenario:
         assert len(records) == 2
 
         # Verify membership sessions deducted
-        from database.models import Membership
         with temp_db.get_session() as session:
-            m = session.query(Membership).filter_by(id=membership_id).first()
+            m = session.get(Membership, membership_id)
             assert m.remaining_sessions == 49
 
     def test_plugin_data_body_stats(self, temp_db):
@@ -245,13 +251,27 @@ class TestTherapyStoreScenario:
 
     def test_full_day_operations(self, temp_db):
         """Full day: messages → parse → records → summary."""
-        # Morning message
-        msg1_id = temp_db.save_raw_message({
-            "msg_id": "therapy-1",
-            "sender_nickname": "小助手",
-            "content": "1.28段老师头疗30",
-            "timestamp": datetime(2024, 1, 28, 10, 0, 0),
-        })
+        # All of the day's messages land in one bulk insert
+        msg1_id, msg2_id, msg3_id = temp_db.save_raw_messages_bulk([
+            {
+                "msg_id": "therapy-1",
+                "sender_nickname": "小助手",
+                "content": "1.28段老师头疗30",
+                "timestamp": DT_2024_01_28_10,
+            },
+            {
+                "msg_id": "therapy-2",
+                "sender_nickname": "小助手",
+                "content": "1.28姚老师理疗198-20李哥178",
+                "timestamp": datetime(2024, 1, 28, 14, 0, 0),
+            },
+            {
+                "msg_id": "therapy-3",
+                "sender_nickname": "小助手",
+                "content": "泡脚液销售",
+                "timestamp": datetime(2024, 1, 28, 16, 0, 0),
+            },
+        ])
         temp_db.save_service_record(
             {
                 "customer_name": "段老师",
@@ -264,12 +284,6 @@ class TestTherapyStoreScenario:
         temp_db.update_parse_status(msg1_id, "parsed")
 
         # Afternoon message with commission
-        msg2_id = temp_db.save_raw_message({
-            "msg_id": "therapy-2",
-            "sender_nickname": "小助手",
-            "content": "1.28姚老师理疗198-20李哥178",
-            "timestamp": datetime(2024, 1, 28, 14, 0, 0),
-        })
         temp_db.save_service_record(
             {
                 "customer_name": "姚老师",
@@ -285,12 +299,6 @@ class TestTherapyStoreScenario:
         temp_db.update_parse_status(msg2_id, "parsed")
 
         # Product sale
-        msg3_id = temp_db.save_raw_message({
-            "msg_id": "therapy-3",
-            "sender_nickname": "小助手",
-            "content": "泡脚液销售",
-            "timestamp": datetime(2024, 1, 28, 16, 0, 0),
-        })
         temp_db.save_product_sale(
             {
                 "service_or_product": "泡脚液",
@@ -313,7 +321,7 @@ class TestTherapyStoreScenario:
             r["total_amount"] for r in records if r["type"] == "product_sale"
         )
         temp_db.save_daily_summary(
-            date(2024, 1, 28),
+            D_2024_01_28,
             {
                 "total_service_revenue": service_total,
                 "total_product_revenue": product_total,
@@ -323,7 +331,7 @@ class TestTherapyStoreScenario:
             },
         )
 
-        summary = temp_db.summaries.get_by_date(date(2024, 1, 28))
+        summary = temp_db.summaries.get_by_date(D_2024_01_28)
         assert summary is not None
         assert float(summary.total_service_revenue) == 228
         assert float(summary.total_product_revenue) == 68
@@ -355,10 +363,10 @@ class TestTherapyStoreScenario:
             msg2,
         )
 
-        # Deduct
-        temp_db.memberships.deduct_balance(mid, 198)
-        temp_db.memberships.deduct_session(mid, 1)
-        temp_db.memberships.add_points(mid, 20)
+        # Deduct balance + session and add points in one UPDATE
+        temp_db.memberships.apply_usage(
+            mid, balance_delta=198, sessions_delta=1, points_delta=20
+        )
 
         # Verify final state
         info = temp_db.get_customer_info("VIP客户")
@@ -379,7 +387,7 @@ class TestDataFlowIntegration:
             "msg_id": "pipeline-1",
             "sender_nickname": "recorder",
             "content": "张三 头疗 30",
-            "timestamp": datetime(2024, 1, 28, 10, 0, 0),
+            "timestamp": DT_2024_01_28_10,
             "is_business": True,
         })
 
@@ -408,7 +416,7 @@ class TestDataFlowIntegration:
         # Step 5: Generate summary
         records = temp_db.get_daily_records("2024-01-28")
         temp_db.save_daily_summary(
-            date(2024, 1, 28),
+            D_2024_01_28,
             {
                 "total_service_revenue": sum(
                     r.get("amount", 0) or r.get("total_amount", 0) for r in records
@@ -418,7 +426,7 @@ class TestDataFlowIntegration:
         )
 
         # Verify
-        summary = temp_db.summaries.get_by_date(date(2024, 1, 28))
+        summary = temp_db.summaries.get_by_date(D_2024_01_28)
         assert summary is not None
         assert float(summary.total_service_revenue) == 30
         assert summary.service_count == 1
@@ -453,55 +461,67 @@ class TestDataFlowIntegration:
         temp_db.service_records.update_by_id(ServiceRecord, rid, amount=198)
 
         with temp_db.get_session() as session:
-            record = session.query(ServiceRecord).filter_by(id=rid).first()
+            record = session.get(ServiceRecord, rid)
             assert float(record.amount) == 198
 
 
 class TestEdgeCases:
-    """Edge case and boundary tests."""
-
-    def test_zero_amount_service(self, temp_db):
-        msg_id = make_raw_message(temp_db, "edge-zero")
-        rid = temp_db.save_service_record(
-            {
-                "customer_name": "FreeTrial",
-                "service_or_product": "Trial",
-                "date": "2024-01-28",
-                "amount": 0,
-            },
-            msg_id,
-        )
-        assert rid > 0
-
-    def test_special_characters_in_names(self, temp_db):
-        """Handle various special characters."""
-        temp_db.customers.get_or_create("O'Brien")
-        temp_db.customers.get_or_create("张三-VIP")
-        temp_db.customers.get_or_create("用户(test)")
-
-        results = temp_db.customers.search("O'Brien")
-        assert len(results) == 1
-
-    def test_empty_extra_data(self, temp_db):
-        msg_id = make_raw_message(temp_db, "edge-empty-extra")
-        rid = temp_db.save_service_record(
-            {
-                "customer_name": "EmptyExtra",
-                "service_or_product": "Test",
-                "date": "2024-01-28",
-                "amount": 100,
-                "extra_data": {},
-            },
-            msg_id,
-        )
-        with temp_db.get_session() as session:
-            r = session.query(ServiceRecord).filter_by(id=rid).first()
-            assert r.extra_data == {}
-
-    def test_concurrent_customer_creation(self, temp_db):
-        """Multiple get_or_create calls for same customer should be idempotent."""
-        c1 = temp_db.customers.get_or_create("SharedCustomer")
-        c2 = temp_db.customers.get_or_create("SharedCustomer")
-        c3 = temp_db.customers.get_or_create("SharedCustomer")
-        assert c1.id == c2.id == c3.id
+    """Edge case and boundary tests (one parametrized body, shared setup)."""
+
+    @pytest.mark.parametrize(
+        "case",
+        ["zero_amount", "special_chars", "empty_extra"],
+    )
+    def test_edge_case(self, temp_db, case):
+        if case == "zero_amount":
+            msg_id = make_raw_message(temp_db, "edge-zero")
+            rid = temp_db.save_service_record(
+                {
+                    "customer_name": "FreeTrial",
+                    "service_or_product": "Trial",
+                    "date": "2024-01-28",
+                    "amount": 0,
+                },
+                msg_id,
+            )
+            assert rid > 0
+        elif case == "special_chars":
+            # Handle various special characters in names (bulk create)
+            ids = temp_db.customers.ensure_many(
+                ["O'Brien", "张三-VIP", "用户(test)"]
+            )
+            assert len(ids) == 3
+
+            results = temp_db.customers.search("O'Brien")
+            assert len(results) == 1
+        elif case == "empty_extra":
+            msg_id = make_raw_message(temp_db, "edge-empty-extra")
+            rid = temp_db.save_service_record(
+                {
+                    "customer_name": "EmptyExtra",
+                    "service_or_product": "Test",
+                    "date": "2024-01-28",
+                    "amount": 100,
+                    "extra_data": {},
+                },
+                msg_id,
+            )
+            with temp_db.get_session() as session:
+                r = session.get(ServiceRecord, rid)
+                assert r.extra_data == {}
+
+    def test_concurrent_customer_creation(self, isolated_db):
+        # get_or_create must stay idempotent under concurrent callers
+        # sharing one engine (WAL mode, see conftest pragmas); needs the
+        # per-test engine — temp_db's shared connection is single-threaded.
+        seeded = isolated_db.customers.get_or_create("SharedCustomer")
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [
+                pool.submit(
+                    isolated_db.customers.get_or_create, "SharedCustomer"
+                )
+                for _ in range(8)
+            ]
+            ids = {f.result().id for f in futures}
+        assert ids == {seeded.id}
 
@@ -16,9 +16,13 @@ from datetime import date, datetime
 
 import pytest
 
-from database.models import DailySummary, ServiceRecord
+from database.models import DailySummary, RawMessage, ServiceRecord
 from tests.database.conftest import make_raw_message
 
+# Shared date constants; built once at import instead of per call site.
+D_2024_01_28 = date(2024, 1, 28)
+DT_2024_01_28_10 = datetime(2024, 1, 28, 10, 0, 0)
+
 
 class TestManagerProperties:
     """Test DatabaseManager property accessors."""
@@ -55,7 +59,7 @@ class TestManagerSaveRawMessage:
             "msg_id": "dm-msg-1",
             "sender_nickname": "user",
             "content": "hello",
-            "timestamp": datetime(2024, 1, 28, 10, 0, 0),
+            "timestamp": DT_2024_01_28_10,
         }
         id1 = temp_db.save_raw_message(payload)
         id2 = temp_db.save_raw_message(payload)
@@ -69,9 +73,8 @@ class TestManagerUpdateParseStatus:
         msg_id = make_raw_message(temp_db, "dm-parse")
         temp_db.update_parse_status(msg_id, "parsed", result={"n": 1})
 
-        from database.models import RawMessage
         with temp_db.get_session() as session:
-            msg = session.query(RawMessage).filter_by(id=msg_id).first()
+            msg = session.get(RawMessage, msg_id)
             assert msg.parse_status == "parsed"
             assert msg.parse_result == {"n": 1}
 
@@ -130,18 +133,18 @@ class TestManagerSaveDailySummary:
 
     def test_basic_save(self, temp_db):
         sid = temp_db.save_daily_summary(
-            date(2024, 1, 28),
+            D_2024_01_28,
             {"total_service_revenue": 500, "service_count": 3},
         )
         assert sid > 0
 
     def test_upsert(self, temp_db):
         sid1 = temp_db.save_daily_summary(
-            date(2024, 1, 28),
+            D_2024_01_28,
             {"total_service_revenue": 500},
         )
         sid2 = temp_db.save_daily_summary(
-            date(2024, 1, 28),
+            D_2024_01_28,
             {"total_service_revenue": 600},
         )
         assert sid1 == sid2
@@ -151,28 +154,31 @@ class TestManagerGetDailyRecords:
     """Test DatabaseManager.get_daily_records()."""
 
     def test_combines_services_and_sales(self, temp_db):
-        msg1 = make_raw_message(temp_db, "dm-daily-sr")
-        msg2 = make_raw_message(temp_db, "dm-daily-ps")
-
-        temp_db.save_service_record(
-            {
-                "customer_name": "Alice",
-                "service_or_product": "Therapy",
-                "date": "2024-01-28",
-                "amount": 100,
-            },
-            msg1,
-        )
-        temp_db.save_product_sale(
-            {
-                "service_or_product": "Product",
-                "date": "2024-01-28",
-                "amount": 50,
-            },
-            msg2,
-        )
-
-        records = temp_db.get_daily_records(date(2024, 1, 28))
+        # One transaction for the whole seeding batch instead of a
+        # session-per-save round trip.
+        with temp_db.bulk_context():
+            msg1 = make_raw_message(temp_db, "dm-daily-sr")
+            msg2 = make_raw_message(temp_db, "dm-daily-ps")
+
+            temp_db.save_service_record(
+                {
+                    "customer_name": "Alice",
+                    "service_or_product": "Therapy",
+                    "date": "2024-01-28",
+                    "amount": 100,
+                },
+                msg1,
+            )
+            temp_db.save_product_sale(
+                {
+                    "service_or_product": "Product",
+                    "date": "2024-01-28",
+                    "amount": 50,
+                },
+                msg2,
+            )
+
+        records = temp_db.get_daily_records(D_2024_01_28)
         assert len(records) == 2
         types = {r["type"] for r in records}
         assert types == {"service", "product_sale"}
@@ -8,12 +8,25 @@ Tests for:
 from datetime import date, datetime
 
 import pytest
+from sqlalchemy import select
 
 from database.models import (
     RawMessage, Correction, DailySummary, PluginData,
 )
 from tests.database.conftest import make_raw_message
 
+# Shared date constants; built once at import instead of per call site.
+D_2024_01_28 = date(2024, 1, 28)
+DT_2024_01_28_10 = datetime(2024, 1, 28, 10, 0, 0)
+
+# Shared template for raw-message payloads; per-test dicts are built
+# with PEP 584 merges instead of repeating the boilerplate keys.
+_BASE_MSG = {
+    "sender_nickname": "user",
+    "content": "test",
+    "timestamp": DT_2024_01_28_10,
+}
+
 
 # ============================================================
 # MessageRepository Tests
@@ -22,74 +35,87 @@ class TestMessageRepository:
     """Tests for MessageRepository."""
 
     def test_save_raw_message_basic(self, temp_db):
-        msg_id = temp_db.messages.save_raw_message({
-            "msg_id": "wx-001",
-            "sender_nickname": "User1",
-            "content": "Hello",
-            "timestamp": datetime(2024, 1, 28, 10, 0, 0),
-        })
+        msg_id = temp_db.messages.save_raw_message(
+            _BASE_MSG | {"msg_id": "wx-001"}
+        )
         assert msg_id > 0
 
     def test_save_raw_message_all_fields(self, temp_db):
-        msg_id = temp_db.messages.save_raw_message({
+        msg_id = temp_db.messages.save_raw_message(_BASE_MSG | {
             "msg_id": "wx-full",
-            "sender_nickname": "FullUser",
-            "content": "Full message",
             "msg_type": "text",
             "group_id": "group-001",
-            "timestamp": datetime(2024, 1, 28, 10, 0, 0),
             "is_at_bot": True,
             "is_business": True,
             "parse_status": "pending",
         })
 
         with temp_db.get_session() as session:
-            msg = session.query(RawMessage).filter_by(id=msg_id).first()
-            assert msg.group_id == "group-001"
-            assert msg.is_at_bot is True
-            assert msg.is_business is True
+            # Plain Row tuple — no ORM hydration for a column check.
+            row = session.execute(
+                select(
+                    RawMessage.msg_id,
+                    RawMessage.msg_type,
+                    RawMessage.group_id,
+                    RawMessage.is_at_bot,
+                    RawMessage.is_business,
+                    RawMessage.parse_status,
+                ).where(RawMessage.id == msg_id)
+            ).one()
+        assert row.msg_id == "wx-full"
+        assert row.msg_type == "text"
+        assert row.group_id == "group-001"
+        assert row.is_at_bot is True
+        assert row.is_business is True
+        assert row.parse_status == "pending"
+
+    def test_save_raw_messages_bulk_mixed_dedup(self, temp_db):
+        """Bulk save returns existing IDs for duplicates, in input order."""
+        first = temp_db.messages.save_raw_message(
+            _BASE_MSG | {"msg_id": "bulk-0"}
+        )
+        ids = temp_db.messages.save_raw_messages_bulk([
+            _BASE_MSG | {"msg_id": "bulk-0"},
+            _BASE_MSG | {"msg_id": "bulk-1"},
+            _BASE_MSG | {"msg_id": "bulk-2"},
+        ])
+        assert ids[0] == first
+        assert len(set(ids)) == 3
+
+    def test_save_raw_messages_bulk_many_rows(self, temp_db):
+        """A large batch lands in one executemany INSERT."""
+        msgs = [_BASE_MSG | {"msg_id": f"bulk-many-{i}"} for i in range(200)]
+        ids = temp_db.messages.save_raw_messages_bulk(msgs)
+        assert len(ids) == 200
+        assert len(set(ids)) == 200
 
     def test_save_raw_message_dedup(self, temp_db):
         """Duplicate msg_id should return the existing ID."""
-        payload = {
-            "msg_id": "wx-dup",
-            "sender_nickname": "user",
-            "content": "hello",
-            "timestamp": datetime(2024, 1, 28, 10, 0, 0),
-        }
+        payload = _BASE_MSG | {"msg_id": "wx-dup"}
         first_id = temp_db.messages.save_raw_message(payload)
         second_id = temp_db.messages.save_raw_message(payload)
         assert first_id == second_id
 
     def test_save_raw_message_without_msg_id(self, temp_db):
         """Message without msg_id should be saved (no dedup)."""
-        msg_id = temp_db.messages.save_raw_message({
-            "sender_nickname": "NoIDUser",
-            "content": "No ID",
-            "timestamp": datetime(2024, 1, 28, 10, 0, 0),
-        })
+        msg_id = temp_db.messages.save_raw_message(dict(_BASE_MSG))
         assert msg_id > 0
 
     def test_save_raw_message_default_msg_type(self, temp_db):
-        msg_id = temp_db.messages.save_raw_message({
-            "msg_id": "wx-defaults",
-            "sender_nickname": "user",
-            "content": "test",
-            "timestamp": datetime(2024, 1, 28, 10, 0, 0),
-        })
-        with temp_db.get_session() as session:
-            msg = session.query(RawMessage).filter_by(id=msg_id).first()
-            assert msg.msg_type == "text"
-            assert msg.parse_status == "pending"
-            assert msg.is_at_bot is False
+        msg_id = temp_db.messages.save_raw_message(
+            _BASE_MSG | {"msg_id": "wx-defaults"}
+        )
+        msg = temp_db.fetch_one(RawMessage, id=msg_id)
+        assert msg.msg_type == "text"
+        assert msg.parse_status == "pending"
+        assert msg.is_at_bot is False
 
     def test_update_parse_status(self, temp_db):
         msg_id = make_raw_message(temp_db, "parse-update")
         temp_db.messages.update_parse_status(msg_id, "parsed")
 
-        with temp_db.get_session() as session:
-            msg = session.query(RawMessage).filter_by(id=msg_id).first()
-            assert msg.parse_status == "parsed"
+        msg = temp_db.fetch_one(RawMessage, id=msg_id)
+        assert msg.parse_status == "parsed"
 
     def test_update_parse_status_with_result(self, temp_db):
         msg_id = make_raw_message(temp_db, "parse-result")
@@ -98,10 +124,9 @@ class TestMessageRepository:
             result={"records": 2, "type": "service"},
         )
 
-        with temp_db.get_session() as session:
-            msg = session.query(RawMessage).filter_by(id=msg_id).first()
-            assert msg.parse_status == "parsed"
-            assert msg.parse_result["records"] == 2
+        msg = temp_db.fetch_one(RawMessage, id=msg_id)
+        assert msg.parse_status == "parsed"
+        assert msg.parse_result["records"] == 2
 
     def test_update_parse_status_with_error(self, temp_db):
         msg_id = make_raw_message(temp_db, "parse-error")
@@ -110,10 +135,9 @@ class TestMessageRepository:
             error="LLM timeout",
         )
 
-        with temp_db.get_session() as session:
-            msg = session.query(RawMessage).filter_by(id=msg_id).first()
-            assert msg.parse_status == "failed"
-            assert msg.parse_error == "LLM timeout"
+        msg = temp_db.fetch_one(RawMessage, id=msg_id)
+        assert msg.parse_status == "failed"
+        assert msg.parse_error == "LLM timeout"
 
     def test_update_parse_status_nonexistent(self, temp_db):
         """Updating non-existent message should not raise."""
@@ -133,14 +157,13 @@ class TestMessageRepository:
         })
         assert correction_id > 0
 
-        with temp_db.get_session() as session:
-            c = session.query(Correction).filter_by(id=correction_id).first()
-            assert c.original_record_type == "service_records"
-            assert c.correction_type == "amount_change"
-            assert c.old_value["amount"] == 100
-            assert c.new_value["amount"] == 120
-            assert c.reason == "手动修正"
-            assert c.raw_message_id == msg_id
+        c = temp_db.fetch_one(Correction, id=correction_id)
+        assert c.original_record_type == "service_records"
+        assert c.correction_type == "amount_change"
+        assert c.old_value["amount"] == 100
+        assert c.new_value["amount"] == 120
+        assert c.reason == "手动修正"
+        assert c.raw_message_id == msg_id
 
     def test_save_correction_minimal(self, temp_db):
         """Correction with minimal fields."""
@@ -149,6 +172,31 @@ class TestMessageRepository:
         })
         assert correction_id > 0
 
+    def test_save_corrections_bulk(self, temp_db):
+        """Bulk insert returns ids in input order; one statement for all rows."""
+        ids = temp_db.messages.save_corrections_bulk([
+            {
+                "correction_type": "amount_change",
+                "old_value": {"amount": i},
+                "new_value": {"amount": i + 1},
+                "reason": f"batch-{i}",
+            }
+            for i in range(1000)
+        ])
+        assert len(ids) == 1000
+        assert len(set(ids)) == 1000
+
+        with temp_db.get_session() as session:
+            first = session.get(Correction, ids[0])
+            last = session.get(Correction, ids[-1])
+            assert first.reason == "batch-0"
+            assert first.old_value == {"amount": 0}
+            assert last.reason == "batch-999"
+            assert last.new_value == {"amount": 1000}
+
+    def test_save_corrections_bulk_empty(self, temp_db):
+        assert temp_db.messages.save_corrections_bulk([]) == []
+
 
 # ============================================================
 # SummaryRepository Tests
@@ -158,7 +206,7 @@ class TestSummaryRepository:
 
     def test_save_new_summary(self, temp_db):
         sid = temp_db.summaries.save(
-            date(2024, 1, 28),
+            D_2024_01_28,
             {
                 "total_service_revenue": 500,
                 "service_count": 3,
@@ -170,26 +218,25 @@ class TestSummaryRepository:
     def test_save_upsert_updates_existing(self, temp_db):
         """Saving to same date should update, not create a new record."""
         sid1 = temp_db.summaries.save(
-            date(2024, 1, 28),
+            D_2024_01_28,
             {"total_service_revenue": 500, "service_count": 3},
         )
         sid2 = temp_db.summaries.save(
-            date(2024, 1, 28),
+            D_2024_01_28,
             {"total_service_revenue": 600},
         )
 
         assert sid1 == sid2
 
-        with temp_db.get_session() as session:
-            s = session.query(DailySummary).filter_by(id=sid1).first()
-            # Updated field
-            assert float(s.total_service_revenue) == 600
-            # Previous field preserved
-            assert s.service_count == 3
+        s = temp_db.fetch_one(DailySummary, id=sid1)
+        # Updated field
+        assert float(s.total_service_revenue) == 600
+        # Previous field preserved
+        assert s.service_count == 3
 
     def test_save_different_dates(self, temp_db):
         sid1 = temp_db.summaries.save(
-            date(2024, 1, 28),
+            D_2024_01_28,
             {"service_count": 3},
         )
         sid2 = temp_db.summaries.save(
@@ -200,7 +247,7 @@ class TestSummaryRepository:
 
     def test_save_all_fields(self, temp_db):
         sid = temp_db.summaries.save(
-            date(2024, 1, 28),
+            D_2024_01_28,
             {
                 "total_service_revenue": 1000,
                 "total_product_revenue": 200,
@@ -215,20 +262,19 @@ class TestSummaryRepository:
             },
         )
 
-        with temp_db.get_session() as session:
-            s = session.query(DailySummary).filter_by(id=sid).first()
-            assert float(s.total_service_revenue) == 1000
-            assert float(s.total_product_revenue) == 200
-            assert s.service_count == 5
-            assert s.new_members == 1
-            assert s.confirmed is True
+        s = temp_db.fetch_one(DailySummary, id=sid)
+        assert float(s.total_service_revenue) == 1000
+        assert float(s.total_product_revenue) == 200
+        assert s.service_count == 5
+        assert s.new_members == 1
+        assert s.confirmed is True
 
     def test_get_by_date(self, temp_db):
         temp_db.summaries.save(
-            date(2024, 1, 28),
+            D_2024_01_28,
             {"service_count": 3},
         )
-        summary = temp_db.summaries.get_by_date(date(2024, 1, 28))
+        summary = temp_db.summaries.get_by_date(D_2024_01_28)
         assert summary is not None
         assert summary.service_count == 3
 
@@ -266,11 +312,30 @@ class TestPluginRepository:
 
     def test_get_all_keys(self, temp_db):
         cust = temp_db.customers.get_or_create("AllKeys")
-        temp_db.plugins.save("test", "customer", cust.id, "k1", "v1")
-        temp_db.plugins.save("test", "customer", cust.id, "k2", "v2")
+        temp_db.plugins.save_many(
+            "test", "customer", cust.id, {"k1": "v1", "k2": "v2"}
+        )
         result = temp_db.plugins.get("test", "customer", cust.id)
         assert result == {"k1": "v1", "k2": "v2"}
 
+    def test_save_many_upserts_existing(self, temp_db):
+        """save_many should update existing keys and insert new ones."""
+        cust = temp_db.customers.get_or_create("BulkUpsert")
+        temp_db.plugins.save("test", "customer", cust.id, "k1", "old")
+        temp_db.plugins.save_many(
+            "test", "customer", cust.id, {"k1": "new", "k2": "v2"}
+        )
+        result = temp_db.plugins.get("test", "customer", cust.id)
+        assert result == {"k1": "new", "k2": "v2"}
+
+    def test_save_many_large_batch(self, temp_db):
+        """100 keys land in one executemany statement."""
+        cust = temp_db.customers.get_or_create("LargeBatch")
+        items = {f"k{i}": i for i in range(100)}
+        temp_db.plugins.save_many("test", "customer", cust.id, items)
+        result = temp_db.plugins.get("test", "customer", cust.id)
+        assert result == items
+
     def test_get_nonexistent_key(self, temp_db):
         result = temp_db.plugins.get("test", "customer", 99999, "nokey")
         assert result is None